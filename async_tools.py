@@ -0,0 +1,105 @@
+from crewai.tools import BaseTool
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import BaseModel
+from typing import Any, Type
+import abc, asyncio, threading
+
+# One event loop in a background thread is shared by every async tool of the process,
+# so waiting on the network costs no thread, whatever the number of crews running
+_loop = None
+_loop_thread = None
+_loop_lock = threading.Lock()
+# Sync tools adapted with as_async() run on this bounded pool instead of one thread per call
+_sync_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="sync-tool")
+_semaphores = {}
+_http_client = None
+
+
+def get_event_loop():
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="async-tools", daemon=True)
+            _loop_thread.start()
+    return _loop
+
+
+def get_http_client():
+    # Shared httpx client (connection pooling), only to be used from the shared event loop
+    global _http_client
+    import httpx
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(timeout=30.0)
+    return _http_client
+
+
+def _semaphore(name, max_concurrency):
+    # Called from the event loop thread only, so no lock is needed
+    if name not in _semaphores:
+        _semaphores[name] = asyncio.Semaphore(max_concurrency)
+    return _semaphores[name]
+
+
+class AsyncBaseTool(BaseTool):
+    """
+    Base class for network tools: implement `async def _arun(...)` instead of `_run`, and
+    set args_schema since crewAI builds the default schema from `_run`.
+    Calls run on the shared event loop, at most max_concurrency at a time per tool name,
+    and fail after timeout seconds. crewAI calls `_run`, which waits for the coroutine.
+    """
+    args_schema: Type[BaseModel]
+    max_concurrency: int = 8
+    timeout: float = 30.0
+
+    @abc.abstractmethod
+    async def _arun(self, **kwargs) -> Any:
+        ...
+
+    async def arun(self, **kwargs):
+        # For async callers already running on the shared loop.
+        # The timeout covers the wait for a free slot too, a queued call doesn't wait past it
+        return await asyncio.wait_for(self._limited(**kwargs), timeout=self.timeout)
+
+    async def _limited(self, **kwargs):
+        async with _semaphore(self.name, self.max_concurrency):
+            return await self._arun(**kwargs)
+
+    def _run(self, *args, **kwargs):
+        if args:
+            kwargs.update(zip(self.args_schema.model_fields, args))
+        if threading.current_thread() is _loop_thread:
+            raise RuntimeError(f"{self.name}: use 'await tool.arun(...)' inside the shared event loop")
+        future = asyncio.run_coroutine_threadsafe(self.arun(**kwargs), get_event_loop())
+        try:
+            return future.result()
+        except asyncio.TimeoutError:
+            return f"Error: {self.name} did not answer within {self.timeout} seconds."
+
+
+class SyncToolAdapter(AsyncBaseTool):
+    """Runs an existing sync tool behind the async interface, on the shared bounded thread pool."""
+    tool: Any = None
+
+    async def _arun(self, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_sync_executor, lambda: self.tool.run(**kwargs))
+
+
+def as_async(tool, max_concurrency=8, timeout=30.0):
+    if isinstance(tool, AsyncBaseTool):
+        return tool
+    # crewAI prefixes the description with the tool name and arguments, keep only the original text
+    description = tool.description.split("Tool Description:", 1)[-1].strip()
+    return SyncToolAdapter(
+        name=tool.name,
+        description=description,
+        args_schema=tool.args_schema,
+        tool=tool,
+        max_concurrency=max_concurrency,
+        timeout=timeout,
+    )
+
+
+def as_async_tools(tools, max_concurrency=8, timeout=30.0):
+    return [as_async(tool, max_concurrency, timeout) for tool in tools]
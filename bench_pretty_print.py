@@ -0,0 +1,80 @@
+# Micro-benchmark of helpers.pretty_print_result and helpers.wrap_stream on multi-megabyte outputs
+# Run with: python bench_pretty_print.py [size in MB]
+from helpers import pretty_print_result, wrap_stream
+import random, sys, time
+
+
+# The implementation before the streaming rewrite, kept here to compare against
+def legacy_pretty_print_result(result):
+  parsed_result = []
+  for line in result.split('\n'):
+      if len(line) > 80:
+          words = line.split(' ')
+          new_line = ''
+          for word in words:
+              if len(new_line) + len(word) + 1 > 80:
+                  parsed_result.append(new_line)
+                  new_line = word
+              else:
+                  if new_line == '':
+                      new_line = word
+                  else:
+                      new_line += ' ' + word
+          parsed_result.append(new_line)
+      else:
+          parsed_result.append(line)
+  return "\n".join(parsed_result)
+
+
+def make_markdown(size_mb, seed=42):
+    # Mix of what the crews produce: long paragraphs, short lines, code blocks and tables
+    random.seed(seed)
+    words = ["market", "inflation", "agent", "strategy", "the", "a", "of", "analysis", "growth",
+             "resume", "experience", "supercalifragilistic", "AI", "data", "report", "and"]
+    parts, size = [], 0
+    while size < size_mb * 1_000_000:
+        kind = random.random()
+        if kind < 0.6:
+            part = " ".join(random.choice(words) for _ in range(random.randint(20, 400)))
+        elif kind < 0.8:
+            part = "## " + " ".join(random.choice(words) for _ in range(5))
+        elif kind < 0.9:
+            part = "```python\n" + "\n".join("x = " + " + ".join(["value"] * 30) for _ in range(5)) + "\n```"
+        else:
+            part = "\n".join("| " + " | ".join(random.choice(words) for _ in range(25)) + " |" for _ in range(5))
+        parts.append(part)
+        size += len(part) + 1
+    # One very long line, e.g. an LLM answer without any newline
+    parts.append(" ".join(random.choice(words) for _ in range(200_000)))
+    return "\n".join(parts)
+
+
+def chunks_of(text, size=64):
+    # Streamed tokens arrive in small chunks
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+def timed(label, function, size_mb):
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed * 1000:>9.1f} ms {size_mb / elapsed:>8.1f} MB/s")
+    return result
+
+
+if __name__ == "__main__":
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    text = make_markdown(size_mb)
+    size_mb = len(text) / 1_000_000
+    print(f"Input: {size_mb:.1f} MB, {text.count(chr(10)) + 1} lines")
+
+    timed("legacy pretty_print_result", lambda: legacy_pretty_print_result(text), size_mb)
+    timed("pretty_print_result", lambda: pretty_print_result(text), size_mb)
+    timed("wrap_stream (64 char chunks)", lambda: sum(1 for _ in wrap_stream(chunks_of(text))), size_mb)
+
+    # Time to the first wrapped line of the long line without newline
+    long_line = text[text.rfind("\n") + 1:]
+    start = time.perf_counter()
+    next(wrap_stream(chunks_of(long_line)))
+    print(f"{'first line of a streamed long line':<40} {(time.perf_counter() - start) * 1000:>9.3f} ms")
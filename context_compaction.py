@@ -0,0 +1,134 @@
+import hashlib, json, os, re, threading
+
+# crewAI joins the outputs of context tasks with this divider before passing them to the agent
+CONTEXT_DIVIDER = re.compile(r"\n\n-{10}\n\n")
+
+
+def estimate_tokens(text):
+    # ~4 characters per token
+    return len(text) // 4
+
+
+def _normalize(text):
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def _sentences(paragraph):
+    return [sentence for sentence in (_normalize(s) for s in re.split(r"(?<=[.!?])\s+", paragraph)) if sentence]
+
+
+def deduplicate(outputs, overlap=0.8):
+    """
+    Drops paragraphs that already appeared in an earlier output, e.g. when a task repeats
+    the research it was given. A paragraph is dropped when at least `overlap` of its sentences
+    were seen before. Tables and code blocks are single paragraphs, so they are kept or dropped whole.
+    """
+    seen = set()
+    result = []
+    for output in outputs:
+        kept = []
+        for paragraph in re.split(r"\n\s*\n", output):
+            sentences = _sentences(paragraph)
+            if not sentences:
+                continue
+            repeated = sum(sentence in seen for sentence in sentences)
+            if repeated / len(sentences) < overlap:
+                kept.append(paragraph)
+            seen.update(sentences)
+        result.append("\n\n".join(kept))
+    return result
+
+
+class ContextCompactor:
+    """
+    Keeps the context passed between chained tasks within a token budget, so later tasks
+    stop growing with the length of the chain:
+    1. overlapping paragraphs between upstream outputs are removed locally,
+    2. if still over budget, the longest outputs are summarized by the LLM to their share
+       of the budget. Summaries are cached on disk by a hash of the output and its budget,
+       so re-running a crew on the same upstream output costs nothing.
+    """
+
+    def __init__(self, llm, token_budget=2000, cache_path="context_cache.json"):
+        self.llm = llm
+        self.token_budget = token_budget
+        self.cache_path = cache_path
+        self.cache = {}
+        self.stats = {"compacted": 0, "summaries": 0, "cache_hits": 0, "tokens_before": 0, "tokens_after": 0}
+        self._lock = threading.Lock()
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, "r") as file:
+                self.cache = json.load(file)
+
+    def _save_cache(self):
+        # Written to a temporary file then renamed, an interrupted write keeps the previous cache
+        if self.cache_path:
+            temporary_path = f"{self.cache_path}.tmp-{os.getpid()}"
+            with open(temporary_path, "w") as file:
+                json.dump(self.cache, file)
+            os.replace(temporary_path, self.cache_path)
+
+    def summarize(self, text, token_budget):
+        key = hashlib.sha256(f"{token_budget}:{text}".encode()).hexdigest()
+        with self._lock:
+            if key in self.cache:
+                self.stats["cache_hits"] += 1
+                return self.cache[key]
+        words = max(int(token_budget * 0.75), 50)
+        summary = self.llm.call([
+            {"role": "system", "content": "You compress reports for another team member who will build on them."},
+            {"role": "user", "content": (
+                f"Summarize the following text in at most {words} words. Keep every fact, number, name, "
+                "date, URL and image link, and keep markdown tables as tables. Drop repetitions and filler.\n\n"
+                f"{text}"
+            )},
+        ])
+        with self._lock:
+            self.stats["summaries"] += 1
+            self.cache[key] = summary
+            self._save_cache()
+        return summary
+
+    def compact(self, context):
+        if not context:
+            return context
+        outputs = deduplicate(CONTEXT_DIVIDER.split(context))
+        lengths = [estimate_tokens(output) for output in outputs]
+
+        if sum(lengths) > self.token_budget:
+            # Short outputs are kept as they are, the rest of the budget is shared by the long ones
+            budgets = list(lengths)
+            long_outputs = set(range(len(outputs)))
+            while long_outputs:
+                share = (self.token_budget - sum(lengths[i] for i in range(len(outputs)) if i not in long_outputs)) // len(long_outputs)
+                short = {i for i in long_outputs if lengths[i] <= share}
+                if not short:
+                    break
+                long_outputs -= short
+            for index in long_outputs:
+                budgets[index] = max(share, 100)
+                outputs[index] = self.summarize(outputs[index], budgets[index])
+
+        compacted = "\n\n----------\n\n".join(outputs)
+        with self._lock:
+            self.stats["compacted"] += 1
+            self.stats["tokens_before"] += estimate_tokens(context)
+            self.stats["tokens_after"] += estimate_tokens(compacted)
+        return compacted
+
+
+def compact_crew_context(crew, compactor):
+    # Every agent of the crew gets its task context compacted before it is put into the prompt
+    for agent in crew.agents:
+        _wrap_execute_task(agent, compactor)
+    return crew
+
+
+def _wrap_execute_task(agent, compactor):
+    execute_task = agent.execute_task
+
+    def compacted_execute_task(task, context=None, tools=None):
+        return execute_task(task, compactor.compact(context), tools)
+
+    # Agents are Pydantic models, set the instance attribute without field validation
+    object.__setattr__(agent, "execute_task", compacted_execute_task)
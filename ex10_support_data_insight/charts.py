@@ -0,0 +1,183 @@
+from concurrent.futures import ProcessPoolExecutor
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional, Type
+import hashlib, json, multiprocessing, os, threading
+import pandas as pd
+
+PRIORITY_ORDER = ["Critical", "High", "Medium", "Low"]
+CHART_NAMES = ["issue_distribution", "priority_levels", "resolution_times", "customer_satisfaction", "agent_performance"]
+
+
+def support_tables(csv_path):
+    """The tables behind the standard charts, computed from the support tickets CSV."""
+    tickets = pd.read_csv(csv_path, parse_dates=["date_submitted"])
+    month = tickets["date_submitted"].dt.to_period("M").astype(str)
+    priorities = tickets["priority"].value_counts()
+    agents = tickets.groupby("agent_id").agg(
+        tickets=("ticket_id", "size"),
+        avg_resolution_minutes=("resolution_time_minutes", "mean"),
+        avg_satisfaction=("satisfaction_rating", "mean"),
+    ).round(1)
+    return {
+        "issue_distribution": tickets["issue_type"].value_counts(),
+        "priority_levels": priorities.reindex([p for p in PRIORITY_ORDER if p in priorities] + [p for p in priorities.index if p not in PRIORITY_ORDER]),
+        "resolution_times": tickets.groupby(month)["resolution_time_minutes"].mean().round(1),
+        "customer_satisfaction": tickets.groupby(month)["satisfaction_rating"].mean().round(2),
+        "agent_performance": agents,
+    }
+
+
+def chart_specs(tables):
+    # Plain data only: the specs are sent to the worker processes and hashed for the cache
+    agents = tables["agent_performance"]
+    return {
+        "issue_distribution": {
+            "kind": "barh", "title": "Issue Distribution", "xlabel": "Tickets",
+            "labels": list(tables["issue_distribution"].index), "values": tables["issue_distribution"].tolist(),
+        },
+        "priority_levels": {
+            "kind": "pie", "title": "Tickets by Priority Level",
+            "labels": list(tables["priority_levels"].index), "values": tables["priority_levels"].tolist(),
+        },
+        "resolution_times": {
+            "kind": "line", "title": "Average Resolution Time per Month", "ylabel": "Minutes",
+            "labels": list(tables["resolution_times"].index), "values": tables["resolution_times"].tolist(),
+        },
+        "customer_satisfaction": {
+            "kind": "line", "title": "Average Customer Satisfaction per Month", "ylabel": "Rating (1-5)", "ylim": [0, 5],
+            "labels": list(tables["customer_satisfaction"].index), "values": tables["customer_satisfaction"].tolist(),
+        },
+        "agent_performance": {
+            "kind": "bar_line", "title": "Agent Performance",
+            "labels": list(agents.index), "values": agents["avg_resolution_minutes"].tolist(),
+            "ylabel": "Avg resolution time (minutes)",
+            "line_values": agents["avg_satisfaction"].tolist(), "line_label": "Avg satisfaction (1-5)", "line_ylim": [0, 5],
+        },
+    }
+
+
+def render_chart(spec, path):
+    # Runs in a worker process: matplotlib is imported once per worker, with a non-interactive backend
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    figure, axes = plt.subplots(figsize=(8, 5))
+    if spec["kind"] == "barh":
+        axes.barh(spec["labels"][::-1], spec["values"][::-1], color="#4C72B0")
+        axes.set_xlabel(spec.get("xlabel", ""))
+    elif spec["kind"] == "pie":
+        axes.pie(spec["values"], labels=spec["labels"], autopct="%1.0f%%", startangle=90)
+        axes.axis("equal")
+    elif spec["kind"] == "line":
+        axes.plot(spec["labels"], spec["values"], marker="o", color="#4C72B0")
+        axes.set_ylabel(spec.get("ylabel", ""))
+        if spec.get("ylim"):
+            axes.set_ylim(*spec["ylim"])
+        axes.grid(alpha=0.3)
+    elif spec["kind"] == "bar_line":
+        axes.bar(spec["labels"], spec["values"], color="#4C72B0")
+        axes.set_ylabel(spec["ylabel"])
+        line_axes = axes.twinx()
+        line_axes.plot(spec["labels"], spec["line_values"], marker="o", color="#DD8452")
+        line_axes.set_ylabel(spec["line_label"])
+        line_axes.set_ylim(*spec["line_ylim"])
+    axes.set_title(spec["title"])
+    figure.tight_layout()
+    temporary_path = f"{path}.tmp{os.getpid()}"
+    figure.savefig(temporary_path, format=os.path.splitext(path)[1][1:], dpi=110)
+    plt.close(figure)
+    os.replace(temporary_path, path)
+    return path
+
+
+def _warm_up():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot  # noqa: F401
+    return os.getpid()
+
+
+class ChartRenderer:
+    """
+    Renders chart specs with matplotlib in a pool of worker processes.
+    Files are named after a hash of their data, so a chart whose data didn't change is
+    returned from the output directory without rendering it again.
+    """
+
+    def __init__(self, output_dir="charts", max_workers=2, image_format="png"):
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        self.image_format = image_format
+        self.stats = {"rendered": 0, "cached": 0}
+        self._pool = None
+        self._lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def start(self):
+        """
+        Starts the workers. Call it early, before the crew starts its threads: the workers are forked,
+        since spawned workers would re-run the crew script that imports this module.
+        """
+        with self._lock:
+            if self._pool is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("fork" if "fork" in methods else None)
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+                self._pool.submit(_warm_up).result()
+        return self
+
+    def path_for(self, name, spec):
+        key = hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+        return os.path.join(self.output_dir, f"{name}-{key}.{self.image_format}")
+
+    def render(self, specs):
+        # Returns {name: path}, rendering only the charts missing from the cache, in parallel
+        self.start()
+        paths, futures = {}, {}
+        for name, spec in specs.items():
+            paths[name] = self.path_for(name, spec)
+            if os.path.exists(paths[name]):
+                self.stats["cached"] += 1
+            else:
+                futures[name] = self._pool.submit(render_chart, spec, paths[name])
+        for future in futures.values():
+            future.result()
+        self.stats["rendered"] += len(futures)
+        return paths
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class ChartRenderInput(BaseModel):
+    charts: Optional[List[str]] = Field(
+        None, description=f"Charts to render, any of: {', '.join(CHART_NAMES)}. Leave empty for all of them."
+    )
+
+
+class SupportChartTool(BaseTool):
+    name: str = "Support Chart Renderer"
+    description: str = (
+        "Renders the standard support charts (issue distribution, priority levels, resolution times, "
+        "customer satisfaction, agent performance) from the support tickets data and returns their "
+        "markdown image links with the data they show. No code to write."
+    )
+    args_schema: Type[BaseModel] = ChartRenderInput
+    csv_path: str
+    renderer: Any = Field(default=None, exclude=True)
+
+    def _run(self, charts: Optional[List[str]] = None) -> str:
+        unknown = [name for name in charts or [] if name not in CHART_NAMES]
+        if unknown:
+            return f"Error: unknown charts {unknown}, choose among {CHART_NAMES}."
+        tables = support_tables(self.csv_path)
+        specs = {name: spec for name, spec in chart_specs(tables).items() if not charts or name in charts}
+        paths = self.renderer.render(specs)
+        return "\n\n".join(
+            f"![{specs[name]['title']}]({path})\n\nData:\n{tables[name].to_string()}"
+            for name, path in paths.items()
+        )
@@ -1,12 +1,19 @@
-from crewai import Agent, Task, Crew, LLM
+from crewai import Agent, Task, Crew
 from crewai_tools import FileReadTool
 from dotenv import load_dotenv, find_dotenv
 from typing import List
 from pydantic import BaseModel, Field
-import os, yaml, json
+import os, sys, yaml, json
 import warnings
 warnings.filterwarnings('ignore')
 
+# Shared modules (usage_metrics, helpers, ...) live in the repository root
+sys.path.append('..')
+from usage_metrics import UsageTracker
+from model_router import create_llm
+from context_compaction import ContextCompactor, compact_crew_context
+from charts import ChartRenderer, SupportChartTool
+
 # Load environment variables from .env file
 _ = load_dotenv(find_dotenv())
 # Set the Gemini API key from environment variables
@@ -20,7 +27,8 @@ with open(file_path, "r") as file:
 # Convert the credentials to a JSON string
 vertex_credentials_json = json.dumps(vertex_credentials)
 
-llm = LLM(
+# Each call is routed to gemini-2.0-flash-lite or gemini-2.0-flash, see model_router.py (MODEL_ROUTING=off disables it)
+llm = create_llm(
         model="gemini/gemini-2.0-flash",
         temperature=0.5,
         max_tokens=5000, # might need to be increased since the tasks are more complex
@@ -46,6 +54,10 @@ tasks_config = configs['tasks']
 
 # Initialize Tool use
 csv_tool = FileReadTool(file_path='./support_tickets_data.csv')
+# Charts are rendered with matplotlib in worker processes and cached by a hash of their data,
+# the workers start now, before the crew starts its threads
+chart_renderer = ChartRenderer(output_dir='charts', max_workers=2).start()
+chart_tool = SupportChartTool(csv_path='./support_tickets_data.csv', renderer=chart_renderer)
 
 # Creating Agents
 suggestion_generation_agent = Agent(
@@ -60,7 +72,7 @@ reporting_agent = Agent(
 
 chart_generation_agent = Agent(
   config=agents_config['chart_generation_agent'],
-  allow_code_execution=True # If set to True, agent can write and execute code in a protected environment using Docker
+  tools=[chart_tool] # Renders the standard charts, no LLM-written code and no Docker container
 )
 
 # Creating Tasks
@@ -102,10 +114,23 @@ support_report_crew = Crew(
   verbose=True
 )
 
+# final_report_assembly concatenates the suggestions, tables and charts of the three previous tasks.
+# The compactor removes the overlap and summarizes them to a fixed token budget, keeping tables and image links
+compact_crew_context(support_report_crew, ContextCompactor(llm, token_budget=3000))
+
 # You can test the Crew by running in the terminal: "crewai test" to test over multiple times and was scored by a Judge LLM
 # You can also train the Crew by running in the terminal: "crewai train"
 # In training mode, you can provide sementic and sentiment feedback to the Crew to improve in the next iteration
 # After training, you can compare the performance before vs after training by running "crewai test" again
 # Or you can directly edit your .yaml files and validate through actual execution
 # Finally, run the final version of your Crew with the following command
-result = support_report_crew.kickoff()
\ No newline at end of file
+# Track tokens, latency and cost of every LLM call, tagged by crew, agent, task and model
+usage_tracker = UsageTracker(crew_name="support_data_insight")
+result = support_report_crew.kickoff()
+
+chart_renderer.close()
+print(f"Charts: {chart_renderer.stats}")
+
+# Show which agents and models burn the budget and latency
+usage_tracker.print_summary()
+usage_tracker.export_jsonl("usage_metrics.jsonl")
\ No newline at end of file
@@ -1,12 +1,20 @@
-from crewai import Agent, Task, Crew, LLM
+from crewai import Agent, Task, Crew
 from crewai_tools import SerperDevTool, ScrapeWebsiteTool, WebsiteSearchTool
 from dotenv import load_dotenv, find_dotenv
 from typing import List, Optional
 from pydantic import BaseModel, Field
-import os, yaml, json, textwrap
+import os, sys, yaml, json, textwrap
 import warnings
 warnings.filterwarnings('ignore')
 
+# Shared modules (usage_metrics, helpers, ...) live in the repository root
+sys.path.append('..')
+from usage_metrics import UsageTracker
+from model_router import create_llm
+from streaming import StreamingOutput
+from structured_output import with_structured_output
+from parallel_tools import with_parallel_tools
+
 # Load environment variables from .env file
 _ = load_dotenv(find_dotenv())
 # Set the Gemini API key from environment variables
@@ -20,21 +28,18 @@ with open(file_path, "r") as file:
 # Convert the credentials to a JSON string
 vertex_credentials_json = json.dumps(vertex_credentials)
 
-# Create 2 LLMs depends on agent
-llm = LLM(
+# One routed LLM for every agent: each call goes to gemini-2.0-flash-lite or gemini-2.0-flash
+# depending on prompt size, task type, tool step vs final answer and the learned success rate per agent.
+# It escalates to gemini-2.0-flash when a lite structured output is not valid JSON
+llm = create_llm(
     model="gemini/gemini-2.0-flash",
+    lite_model="gemini/gemini-2.0-flash-lite",
     temperature=0.5,
     max_tokens=2000,
+    stream=True, # forward tokens as they are generated, see StreamingOutput below
     vertex_credentials=vertex_credentials_json
     )
 
-lite_llm = LLM(
-    model="gemini/gemini-2.0-flash-lite",
-    temperature=0.5,
-    max_tokens=2000,
-    vertex_credentials=vertex_credentials_json
-)
-
 # Define file paths for YAML configurations
 files = {
     'agents': 'config/agents.yaml',
@@ -86,19 +91,19 @@ web_search_tool = WebsiteSearchTool(
 
 # Creating Agents
 # This agent will use Google search for relevant news, reading entire article bodies, extracting headlines
-# Basically, this one does a broad research, so we need a fast and low latency LLM
+# Basically, this one does a broad research, the router sends its tool steps to the fast and low latency LLM
 market_news_monitor_agent = Agent(
     config=agents_config['market_news_monitor_agent'],
-    tools=[search_tool, scrape_tool],
-    llm=lite_llm,
+    tools=with_parallel_tools([search_tool, scrape_tool]), # several searches and scrapes run concurrently in one step
+    llm=llm,
 )
 
 # This agent also uses Google search for relevant news, then use RAG to semantic search from specified URLs efficiently 
-# This one does a specific research within a website, and we also need a fast and low latency LLM
+# This one does a specific research within a website, also mostly routed to the fast and low latency LLM
 data_analyst_agent = Agent(
     config=agents_config['data_analyst_agent'],
-    tools=[search_tool, web_search_tool],
-    llm=lite_llm,
+    tools=with_parallel_tools([search_tool, web_search_tool]),
+    llm=llm,
 )
 
 content_creator_agent = Agent(
@@ -131,9 +136,10 @@ create_content_task = Task(
 
 quality_assurance_task = Task(
     config=tasks_config['quality_assurance'],
-    agent=quality_assurance_agent,
-    output_pydantic=ContentOutput
+    agent=quality_assurance_agent
 )
+# ContentOutput is validated and repaired locally, no extra LLM call to convert the answer
+quality_assurance_task = with_structured_output(quality_assurance_task, ContentOutput, llm=llm)
 
 # Creating Crew
 content_creation_crew = Crew(
@@ -153,6 +159,10 @@ content_creation_crew = Crew(
 )
 
 # Kicking off the Crew
+# Track tokens, latency and cost of every LLM call, tagged by crew, agent, task and model
+usage_tracker = UsageTracker(crew_name="content_creation")
+# Print the article while the content creator writes it, the final task only turns it into structured output
+streaming_output = StreamingOutput(stdout_tasks=[create_content_task])
 result = content_creation_crew.kickoff(inputs={
   'subject': 'Inflation in the US and the impact on the stock market in 2024'
 })
@@ -165,4 +175,9 @@ for post in posts:
     print(platform)
     wrapped_content = textwrap.fill(content, width=50)
     print(wrapped_content)
-    print('-' * 50)
\ No newline at end of file
+    print('-' * 50)
+
+# Show which agents and models burn the budget and latency
+usage_tracker.print_summary()
+print(f"Model routing: {getattr(llm, 'routed', 'off')}")
+usage_tracker.export_jsonl("usage_metrics.jsonl")
\ No newline at end of file
@@ -1,5 +1,8 @@
-from crewai import Agent, Task, Crew, LLM
+from crewai import Agent, Task, Crew
 from dotenv import load_dotenv, find_dotenv
+from usage_metrics import UsageTracker
+from model_router import create_llm
+from streaming import StreamingOutput
 import os, sys, json
 
 # Load environment variables from .env file
@@ -15,10 +18,12 @@ with open(file_path, "r") as file:
 # Convert the credentials to a JSON string
 vertex_credentials_json = json.dumps(vertex_credentials)
 
-llm = LLM(
+# Each call is routed to gemini-2.0-flash-lite or gemini-2.0-flash, see model_router.py (MODEL_ROUTING=off disables it)
+llm = create_llm(
     model="gemini/gemini-2.0-flash",
     temperature=0.5,
     max_tokens=2000,
+    stream=True, # forward tokens as they are generated, see StreamingOutput below
     vertex_credentials=vertex_credentials_json
 )
 
@@ -135,5 +140,15 @@ crew = Crew(
 )
 
 # Running the crew
+# Track tokens, latency and cost of every LLM call, tagged by crew, agent, task and model
+usage_tracker = UsageTracker(crew_name="ai_writer")
+# Print the edited blog post while it is being written instead of waiting for the whole crew
+streaming_output = StreamingOutput(stdout_tasks=[edit])
 result = crew.kickoff(inputs={"topic": "Samsung Galaxy S24 Plus is better than iPhone 15 Pro Max"})
-print(result)
\ No newline at end of file
+# The result was already printed while streaming, unless no final answer was streamed
+if not streaming_output.printed(edit):
+    print(result)
+
+# Show which agents and models burn the budget and latency
+usage_tracker.print_summary()
+usage_tracker.export_jsonl("usage_metrics.jsonl")
\ No newline at end of file
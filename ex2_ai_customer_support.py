@@ -1,6 +1,8 @@
-from crewai import Agent, Task, Crew, LLM
+from crewai import Agent, Task, Crew
 from crewai_tools import ScrapeWebsiteTool
 from dotenv import load_dotenv, find_dotenv
+from usage_metrics import UsageTracker
+from model_router import create_llm
 import os, sys, json
 import warnings
 warnings.filterwarnings('ignore') # Suppress unimportant warnings
@@ -18,7 +20,8 @@ with open(file_path, "r") as file:
 # Convert the credentials to a JSON string
 vertex_credentials_json = json.dumps(vertex_credentials)
 
-llm = LLM(
+# Each call is routed to gemini-2.0-flash-lite or gemini-2.0-flash, see model_router.py (MODEL_ROUTING=off disables it)
+llm = create_llm(
         model="gemini/gemini-2.0-flash",
         temperature=0.5,
         max_tokens=2000,
@@ -151,5 +154,11 @@ inputs = {
                "how can I add memory to my crew? "
                "Can you provide guidance?"
 }
+# Track tokens, latency and cost of every LLM call, tagged by crew, agent, task and model
+usage_tracker = UsageTracker(crew_name="customer_support")
 result = crew.kickoff(inputs=inputs)
-print(result)
\ No newline at end of file
+print(result)
+
+# Show which agents and models burn the budget and latency
+usage_tracker.print_summary()
+usage_tracker.export_jsonl("usage_metrics.jsonl")
\ No newline at end of file
@@ -1,8 +1,15 @@
-from crewai import Agent, Task, Crew, LLM
-from crewai_tools import SerperDevTool, DirectoryReadTool, FileReadTool
+from crewai import Agent, Task, Crew
+from crewai_tools import SerperDevTool
 from crewai.tools import BaseTool
 from dotenv import load_dotenv, find_dotenv
+from usage_metrics import UsageTracker
+from model_router import create_llm
+from async_tools import as_async
+from sentiment import SentimentScorer
+from instruction_index import InstructionIndex, InstructionSearchTool
 from helpers import pretty_print_result
+from pydantic import BaseModel, Field
+from typing import List, Type
 import os, sys, json
 import warnings
 warnings.filterwarnings('ignore') # Suppress unimportant warnings
@@ -22,7 +29,8 @@ with open(file_path, "r") as file:
 # Convert the credentials to a JSON string
 vertex_credentials_json = json.dumps(vertex_credentials)
 
-llm = LLM(
+# Each call is routed to gemini-2.0-flash-lite or gemini-2.0-flash, see model_router.py (MODEL_ROUTING=off disables it)
+llm = create_llm(
         model="gemini/gemini-2.0-flash",
         temperature=0.5,
         max_tokens=2000,
@@ -72,21 +80,36 @@ lead_sales_rep_agent = Agent(
 )
 
 # Setup the tools for the agents
-directory_read_tool = DirectoryReadTool(directory='./instructions') # Tool allowed to read from this directory only
-file_read_tool = FileReadTool() # Tool allowed to read from any file
-search_tool = SerperDevTool() # Tool to search the web for information by using the Serper API
+# BM25 index over the sections of the instruction playbooks, rebuilt only for the files that changed
+instruction_search_tool = InstructionSearchTool(index=InstructionIndex(directory='./instructions'))
+# Tool to search the web for information by using the Serper API
+# Adapted to the async tool interface, so concurrent crews share a bounded pool for the HTTP calls
+search_tool = as_async(SerperDevTool(), max_concurrency=8, timeout=30.0)
 
 # Setup a custom tool inherting from BaseTool class 
 # Every Tool needs to have a name and a description
+class SentimentAnalysisInput(BaseModel):
+    texts: List[str] = Field(..., description="The email drafts to analyze, all variants in one call.")
+
 class SentimentAnalysisTool(BaseTool):
     name: str ="Sentiment Analysis Tool"
-    description: str = ("Analyzes the sentiment of text "
-         "to ensure positive and engaging communication.")
+    description: str = ("Analyzes the sentiment of a batch of texts "
+         "to ensure positive and engaging communication. "
+         "Pass every draft at once, each gets a label and a score from -1 to 1.")
+    args_schema: Type[BaseModel] = SentimentAnalysisInput
     
-    def _run(self, text: str) -> str:
-        # Your custom code tool goes here
-        return "positive"
+    def _run(self, texts: List[str]) -> str:
+        # Local lexicon scorer, no network: the whole batch is scored at once and cached by text hash
+        if isinstance(texts, str):
+            texts = [texts]
+        scores = sentiment_scorer.score_batch(texts)
+        return "\n".join(
+            f"Draft {index}: {score['label']} (score {score['score']}, "
+            f"positive {score['positive']}, negative {score['negative']})"
+            for index, score in enumerate(scores, start=1)
+        )
     
+sentiment_scorer = SentimentScorer()
 sentiment_analysis_tool = SentimentAnalysisTool()
     
 # Define your Tasks, and provide them a description, expected_output, agent, and tools
@@ -114,7 +137,7 @@ lead_profiling_task = Task(
         "our solutions can provide value, "
         "and suggest personalized engagement strategies."
     ),
-    tools=[directory_read_tool, file_read_tool, search_tool],
+    tools=[instruction_search_tool, search_tool],
     agent=sales_rep_agent,
 )
 
@@ -173,4 +196,10 @@ inputs = {
     "milestone": "product launch"
 }
 
-result = crew.kickoff(inputs=inputs)
\ No newline at end of file
+# Track tokens, latency and cost of every LLM call, tagged by crew, agent, task and model
+usage_tracker = UsageTracker(crew_name="customer_outreach")
+result = crew.kickoff(inputs=inputs)
+
+# Show which agents and models burn the budget and latency
+usage_tracker.print_summary()
+usage_tracker.export_jsonl("usage_metrics.jsonl")
\ No newline at end of file
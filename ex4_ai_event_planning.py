@@ -1,7 +1,11 @@
-from crewai import Agent, Task, Crew, LLM
+from crewai import Agent, Task, Crew
 from crewai_tools import SerperDevTool, ScrapeWebsiteTool
 from pydantic import BaseModel
 from dotenv import load_dotenv, find_dotenv
+from usage_metrics import UsageTracker
+from model_router import create_llm
+from structured_output import with_structured_output
+from output_sink import RunOutputSink, bind_output_files
 import os, sys, json
 import warnings
 warnings.filterwarnings('ignore') # Suppress unimportant warnings
@@ -21,7 +25,8 @@ with open(file_path, "r") as file:
 # Convert the credentials to a JSON string
 vertex_credentials_json = json.dumps(vertex_credentials)
 
-llm = LLM(
+# Each call is routed to gemini-2.0-flash-lite or gemini-2.0-flash, see model_router.py (MODEL_ROUTING=off disables it)
+llm = create_llm(
         model="gemini/gemini-2.0-flash",
         temperature=0.5,
         max_tokens=2000,
@@ -99,10 +104,12 @@ venue_task = Task(
     expected_output="All the details of a specifically chosen"
                     "venue you found to accommodate the event.",
     human_input=True,                   # requires human input to confirm the venue
-    output_json=VenueDetails,           # specify the structure of the output following the Pydantic model
     output_file="venue_details.json",   # output in a JSON file
     agent=venue_coordinator
 )
+# Instead of output_json=VenueDetails: the agent answers in JSON following the schema of the Pydantic model,
+# which is validated and repaired locally, so no extra LLM call is needed to convert the answer
+venue_task = with_structured_output(venue_task, VenueDetails, llm=llm, as_json=True)
 
 # Task 2: Logistics coordination
 logistics_task = Task(
@@ -121,7 +128,7 @@ logistics_task = Task(
 # Task 3: Make marketing plan
 # Set async_execution=True means this task will run but does not wait for it to finish.
 # The kickoff() call returns — potentially before marketing_task finishes, and its output is not included in the return value of kickoff().
-# You can collect its result from the marketing_report.md file
+# You can collect its result from the marketing_report.md file of the run directory (see RunOutputSink below)
 marketing_task = Task(
     description="Promote the {event_topic} "
                 "aiming to engage at least"
@@ -157,4 +164,16 @@ event_details = {
     'budget': 20000,
     'venue_type': "Conference Hall"
 }
-result = event_management_crew.kickoff(inputs=event_details)
\ No newline at end of file
+# Track tokens, latency and cost of every LLM call, tagged by crew, agent, task and model
+usage_tracker = UsageTracker(crew_name="event_planning")
+# The output files go to their own directory per run (outputs/<time>-<run id>/, with a manifest.json),
+# written atomically in a background thread, so several runs can be started in parallel
+output_sink = RunOutputSink(base_dir="outputs")
+bind_output_files(event_management_crew, output_sink)
+result = event_management_crew.kickoff(inputs=event_details)
+output_sink.close()
+print(f"Output files written to {output_sink.run_dir}")
+
+# Show which agents and models burn the budget and latency
+usage_tracker.print_summary()
+usage_tracker.export_jsonl("usage_metrics.jsonl")
\ No newline at end of file
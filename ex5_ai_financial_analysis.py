@@ -1,6 +1,11 @@
-from crewai import Agent, Task, Crew, LLM, Process
+from crewai import Agent, Task
 from crewai_tools import SerperDevTool, ScrapeWebsiteTool
 from dotenv import load_dotenv, find_dotenv
+from usage_metrics import UsageTracker
+from model_router import create_llm
+from tracing import Tracer
+from hybrid_process import HybridCrew
+from parallel_tools import with_parallel_tools
 from datetime import date
 import os, sys, json
 import warnings
@@ -21,7 +26,8 @@ with open(file_path, "r") as file:
 # Convert the credentials to a JSON string
 vertex_credentials_json = json.dumps(vertex_credentials)
 
-llm = LLM(
+# Each call is routed to gemini-2.0-flash-lite or gemini-2.0-flash, see model_router.py (MODEL_ROUTING=off disables it)
+llm = create_llm(
         model="gemini/gemini-2.0-flash",
         temperature=0.5,
         max_tokens=5000, # might need to be increased since the tasks are more complex
@@ -31,6 +37,9 @@ llm = LLM(
 # Initialize the tools
 search_tool = SerperDevTool()
 scrape_tool = ScrapeWebsiteTool()
+# The agents usually need several independent searches and scrapes, the parallel runner lets them
+# request all of them in one step and runs them concurrently instead of one LLM round trip per call
+research_tools = with_parallel_tools([scrape_tool, search_tool])
 
 # Define your Agents, and provide them a role, goal and backstory
 # Agent 1: Data analyst
@@ -45,7 +54,7 @@ data_analyst_agent = Agent(
               "informing trading decisions.",
     verbose=True,
     allow_delegation=False,
-    tools = [scrape_tool, search_tool],
+    tools = research_tools,
     llm=llm
 )
 
@@ -61,7 +70,7 @@ trading_strategy_agent = Agent(
               "the most profitable and risk-averse options.",
     verbose=True,
     allow_delegation=True, # Might delegate parts to Analyst or Risk if needed
-    tools = [scrape_tool, search_tool],
+    tools = research_tools,
     llm=llm
 )
 
@@ -77,7 +86,7 @@ execution_agent = Agent(
               "efficiency and adherence to strategy.",
     verbose=True,
     allow_delegation=False,
-    tools = [scrape_tool, search_tool],
+    tools = research_tools,
     llm=llm
 )
 
@@ -93,7 +102,7 @@ risk_management_agent = Agent(
               "trading activities align with the firm’s risk tolerance.",
     verbose=True,
     allow_delegation=False,
-    tools = [scrape_tool, search_tool],
+    tools = research_tools,
     llm=llm
 )
 
@@ -162,10 +171,12 @@ risk_assessment_task = Task(
 )
 
 # Create your crew of Agents and pass the tasks to be performed by those agents.
-# The Process class helps to delegate the workflow to the Agents hierarchically (by a LLM Manager).
-# manager_llm (in Process.hierarchical) can infer task dependencies if you write task descriptions clearly and refer to prior task outputs.
-# However, it is better to set output_file and read by the next task to avoid any ambiguity and better logging.
-financial_trading_crew = Crew(
+# Process.hierarchical delegates the workflow to the Agents by a LLM Manager, which is called before and after every delegation
+# and has to infer task dependencies from the task descriptions, roughly doubling the LLM calls of a sequential crew.
+# HybridCrew calls the manager once to plan which agent runs which task and which prior outputs it needs,
+# then runs the plan sequentially. The manager is only called again to review an output that looks like a failure.
+# It is still better to set output_file and read by the next task to avoid any ambiguity and better logging.
+financial_trading_crew = HybridCrew(
     agents=[data_analyst_agent, 
             trading_strategy_agent, 
             execution_agent, 
@@ -175,7 +186,6 @@ financial_trading_crew = Crew(
            execution_planning_task, 
            risk_assessment_task],
     manager_llm=llm,
-    process=Process.hierarchical,
     verbose=True
 )
 
@@ -190,4 +200,17 @@ financial_trading_inputs = {
 }
 
 # The value in result will be the output of the last task listed in the tasks=[...] array
-result = financial_trading_crew.kickoff(inputs=financial_trading_inputs)
\ No newline at end of file
+# Track tokens, latency and cost of every LLM call, tagged by crew, agent, task and model
+usage_tracker = UsageTracker(crew_name="financial_analysis")
+# Record a span around every task, LLM call, tool run and delegation to find where the time goes
+tracer = Tracer("financial_analysis_trace.json")
+result = financial_trading_crew.kickoff(inputs=financial_trading_inputs)
+
+# Show which agents and models burn the budget and latency
+usage_tracker.print_summary()
+usage_tracker.export_jsonl("usage_metrics.jsonl")
+
+# Top time sinks of this run, open the trace file in https://ui.perfetto.dev for a flame graph
+tracer.save()
+tracer.print_summary()
+print(f"Manager LLM calls: {financial_trading_crew.manager_calls}")
\ No newline at end of file
@@ -1,6 +1,11 @@
-from crewai import Agent, Task, Crew, LLM
+from crewai import Agent, Task, Crew
 from crewai_tools import SerperDevTool, ScrapeWebsiteTool, FileReadTool, MDXSearchTool
 from dotenv import load_dotenv, find_dotenv
+from usage_metrics import UsageTracker
+from model_router import create_llm
+from streaming import StreamingOutput
+from context_compaction import ContextCompactor, compact_crew_context
+from output_sink import RunOutputSink, bind_output_files
 import os, sys, json
 import warnings
 warnings.filterwarnings('ignore') # Suppress unimportant warnings
@@ -20,10 +25,12 @@ with open(file_path, "r") as file:
 # Convert the credentials to a JSON string
 vertex_credentials_json = json.dumps(vertex_credentials)
 
-llm = LLM(
+# Each call is routed to gemini-2.0-flash-lite or gemini-2.0-flash, see model_router.py (MODEL_ROUTING=off disables it)
+llm = create_llm(
         model="gemini/gemini-2.0-flash",
         temperature=0.5,
         max_tokens=5000, # might need to be increased since the tasks are more complex
+        stream=True, # forward tokens as they are generated, see StreamingOutput below
         vertex_credentials=vertex_credentials_json
     )
 
@@ -219,6 +226,10 @@ job_application_crew = Crew(
     verbose=True
 )
 
+# Task 4 receives the outputs of tasks 1, 2 & 3, which repeat each other and grow with every step.
+# The compactor removes the overlap and summarizes them to a fixed token budget (summaries are cached by output hash)
+compact_crew_context(job_application_crew, ContextCompactor(llm, token_budget=2500))
+
 # Set the input parameters and run the crew
 job_application_inputs = {
     'job_posting_url': 'https://jobs.lever.co/AIFund/6c82e23e-d954-4dd8-a734-c0c2c5ee00f1?lever-origin=applied&lever-source%5B%5D=AI+Fund',
@@ -232,4 +243,19 @@ job_application_inputs = {
     innovation and growth in the tech industry. Ideal for leadership
     roles that require a strategic and innovative approach."""
 }
-result = job_application_crew.kickoff(inputs=job_application_inputs)
\ No newline at end of file
+# Track tokens, latency and cost of every LLM call, tagged by crew, agent, task and model
+usage_tracker = UsageTracker(crew_name="job_application")
+# tailored_resume.md and interview_materials.md go to their own directory per run (outputs/<time>-<run id>/,
+# with a manifest.json), so parallel runs don't overwrite each other. While the agents generate them, they are
+# streamed to <name>.partial in that directory, replaced by the final file written atomically when each task is done.
+# The interview materials are also printed to the console as they are generated
+output_sink = RunOutputSink(base_dir="outputs")
+bind_output_files(job_application_crew, output_sink)
+streaming_output = StreamingOutput(stdout_tasks=[interview_preparation_task], output_path=output_sink.stream_path)
+result = job_application_crew.kickoff(inputs=job_application_inputs)
+output_sink.close()
+print(f"Output files written to {output_sink.run_dir}")
+
+# Show which agents and models burn the budget and latency
+usage_tracker.print_summary()
+usage_tracker.export_jsonl("usage_metrics.jsonl")
\ No newline at end of file
@@ -1,11 +1,17 @@
-from crewai import Agent, Task, Crew, LLM
+from crewai import Agent, Task, Crew
 from dotenv import load_dotenv, find_dotenv
 from typing import List
 from pydantic import BaseModel, Field
-import os, yaml, json
+import os, sys, yaml, json
 import warnings
 warnings.filterwarnings('ignore')
 
+# Shared modules (usage_metrics, helpers, ...) live in the repository root
+sys.path.append('..')
+from usage_metrics import UsageTracker
+from model_router import create_llm
+from structured_output import with_structured_output
+
 # Load environment variables from .env file
 _ = load_dotenv(find_dotenv())
 # Set the Gemini API key from environment variables
@@ -19,7 +25,8 @@ with open(file_path, "r") as file:
 # Convert the credentials to a JSON string
 vertex_credentials_json = json.dumps(vertex_credentials)
 
-llm = LLM(
+# Each call is routed to gemini-2.0-flash-lite or gemini-2.0-flash, see model_router.py (MODEL_ROUTING=off disables it)
+llm = create_llm(
         model="gemini/gemini-2.0-flash",
         temperature=0.5,
         max_tokens=5000, # might need to be increased since the tasks are more complex
@@ -87,9 +94,10 @@ time_resource_estimation = Task(
 
 resource_allocation = Task(
     config=tasks_config['resource_allocation'],
-    agent=resource_allocation_agent,
-    output_pydantic=ProjectPlan # This is the structured output we want
+    agent=resource_allocation_agent
 )
+# This is the structured output we want, validated and repaired locally instead of an extra LLM conversion call
+resource_allocation = with_structured_output(resource_allocation, ProjectPlan, llm=llm)
 
 # Creating Crew
 crew = Crew(
@@ -139,13 +147,17 @@ inputs = {
 }
 
 # Run the crew
+# Track tokens, latency and cost of every LLM call, tagged by crew, agent, task and model
+usage_tracker = UsageTracker(crew_name="automated_project")
 result = crew.kickoff(inputs=inputs)
 
-# Optional, measure how much it would cost each time if this crew runs at scale. (in case of ChatGPT 4o mini)
+# Optional, measure how much it would cost each time if this crew runs at scale.
+# The price comes from the Gemini price table in usage_metrics.py, per agent and model
 import pandas as pd
 
-costs = 0.150 * (crew.usage_metrics.prompt_tokens + crew.usage_metrics.completion_tokens) / 1_000_000
-print(f"Total costs: ${costs:.4f}")
+usage_tracker.print_summary()
+usage_tracker.export_jsonl("usage_metrics.jsonl")
+usage_tracker.export_prometheus("usage_metrics.prom")
 
 # Convert UsageMetrics instance to a DataFrame
 df_usage_metrics = pd.DataFrame([crew.usage_metrics.dict()])
@@ -0,0 +1,92 @@
+"""
+Load test of the Trello tools (and optionally the whole crew) against trello_mock_server.py.
+
+    python bench_trello_load.py --sizes 10 100 1000 10000 --latency 0.2 --failure-rate 0.05
+    python bench_trello_load.py --sizes 10 1000 --crew    # also times main.py end to end, needs the LLM credentials
+
+For every board size, the board and card tools are called concurrently and the latency percentiles,
+the payload size and the number of fallbacks to the fixture are reported.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse, json, os, random, subprocess, sys, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# The mock server accepts any credentials
+for variable in ("TRELLO_API_KEY", "TRELLO_API_TOKEN", "TRELLO_BOARD_ID"):
+    os.environ.setdefault(variable, "mock")
+
+from trello_mock_server import TrelloMockServer
+from trello_tools import BoardDataFetcherTool, CardDataFetcherTool
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(int(len(values) * share), len(values) - 1)] if values else 0.0
+
+
+def timed(call):
+    start = time.perf_counter()
+    result = call()
+    return time.perf_counter() - start, result
+
+
+def run_calls(calls, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(timed, calls))
+
+
+def bench_size(size, args):
+    with TrelloMockServer(cards=size, latency=args.latency, jitter=args.jitter, latency_per_card=args.latency_per_card,
+                          failure_rate=args.failure_rate, seed=args.seed, port=0) as server:
+        os.environ["DLAI_TRELLO_BASE_URL"] = server.base_url
+        board_tool, card_tool = BoardDataFetcherTool(), CardDataFetcherTool()
+
+        board_runs = run_calls([board_tool.run for _ in range(args.requests)], args.concurrency)
+        card_ids = random.Random(args.seed).choices([card["id"] for card in server.board["cards"]], k=args.requests)
+        card_runs = run_calls([lambda card_id=card_id: card_tool.run(card_id=card_id) for card_id in card_ids], args.concurrency)
+
+        # The tools return the parsed JSON on success and a string (fixture or error) on failure
+        payloads = [len(json.dumps(result)) for _, result in board_runs if not isinstance(result, str)]
+        row = {
+            "cards": size,
+            "board_p50": percentile([seconds for seconds, _ in board_runs], 0.5),
+            "board_p95": percentile([seconds for seconds, _ in board_runs], 0.95),
+            "board_fallbacks": sum(isinstance(result, str) for _, result in board_runs),
+            "card_p50": percentile([seconds for seconds, _ in card_runs], 0.5),
+            "card_p95": percentile([seconds for seconds, _ in card_runs], 0.95),
+            "card_fallbacks": sum(isinstance(result, str) for _, result in card_runs),
+            "payload_kb": (sum(payloads) / len(payloads) / 1024) if payloads else 0.0,
+            "crew_seconds": None,
+        }
+        if args.crew:
+            # The whole data_collection -> data_analysis -> report_generation chain, in its own process
+            row["crew_seconds"], _ = timed(lambda: subprocess.run(
+                [sys.executable, "main.py"], cwd=HERE, env=dict(os.environ), check=False,
+                stdout=subprocess.DEVNULL if not args.verbose else None,
+            ))
+        return row
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test of the Trello tools against the local mock server.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000], help="Board sizes in cards.")
+    parser.add_argument("--requests", type=int, default=20, help="Calls per tool and board size.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--latency-per-card", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--crew", action="store_true", help="Also run main.py once per board size and time it.")
+    parser.add_argument("--verbose", action="store_true", help="Show the crew output with --crew.")
+    args = parser.parse_args()
+
+    print(f"{'cards':>6} | {'board p50':>9} | {'board p95':>9} | {'fallbacks':>9} | {'card p50':>8} | {'card p95':>8} | {'fallbacks':>9} | {'payload':>9} | {'crew':>8}")
+    for size in args.sizes:
+        row = bench_size(size, args)
+        crew = f"{row['crew_seconds']:.1f}s" if row["crew_seconds"] is not None else "-"
+        print(
+            f"{row['cards']:>6} | {row['board_p50']:>8.3f}s | {row['board_p95']:>8.3f}s | {row['board_fallbacks']:>9} | "
+            f"{row['card_p50']:>7.3f}s | {row['card_p95']:>7.3f}s | {row['card_fallbacks']:>9} | "
+            f"{row['payload_kb']:>7.1f}KB | {crew:>8}"
+        )
@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+import pandas as pd
+import numpy as np
+
+DONE_LISTS = r"done|complete|closed|shipped|released"
+# Comments that signal a blocked card
+BLOCKER_PATTERN = r"block|waiting (?:on|for)|stuck|depends on|dependency|harder th[ae]n expect|can'?t|cannot|delay|on hold|failing"
+# Cards without activity for longer than this are stale
+STALE_DAYS = 7
+VELOCITY_DAYS = 7
+
+
+def cards_frame(cards, list_names=None, now=None):
+    """One row per card: list, due date, last activity, label names and comment texts."""
+    list_names = list_names or {}
+    frame = pd.DataFrame({
+        "name": [card.get("name", "") for card in cards],
+        "list": [list_names.get(card.get("idList"), card.get("idList", "")) for card in cards],
+        "due": pd.to_datetime([card.get("due") for card in cards], utc=True, errors="coerce"),
+        "last_activity": pd.to_datetime([card.get("dateLastActivity") for card in cards], utc=True, errors="coerce"),
+        "labels": [[(label.get("name") or label.get("color") or "").strip() for label in card.get("labels") or []] for card in cards],
+        "comments": [
+            [action.get("data", {}).get("text", "") for action in card.get("actions") or [] if action.get("type", "commentCard") == "commentCard"]
+            for card in cards
+        ],
+    })
+    frame.attrs["now"] = pd.Timestamp(now or datetime.now(timezone.utc))
+    return frame
+
+
+def compute_metrics(cards, list_names=None, now=None):
+    """
+    Deterministic board metrics, computed column-wise over all the cards:
+    overdue cards, days in list (days since the last activity, the cards endpoint has no move date),
+    label counts, blockers flagged by labels or comment text, progress per list and velocity.
+    """
+    frame = cards_frame(cards, list_names, now)
+    now = frame.attrs["now"]
+    labels = frame["labels"].explode().dropna().astype(str)
+    labels = labels[labels != ""].str.lower()
+
+    frame["done"] = frame["list"].astype(str).str.contains(DONE_LISTS, case=False, regex=True)
+    frame["overdue"] = frame["due"].notna() & (frame["due"] < now) & ~frame["done"]
+    frame["days_overdue"] = np.where(frame["overdue"], (now - frame["due"]).dt.days.fillna(0), 0).astype(int)
+    frame["days_in_list"] = (now - frame["last_activity"]).dt.days.fillna(0).astype(int)
+    frame["urgent"] = labels.eq("urgent").groupby(level=0).any().reindex(frame.index, fill_value=False)
+    # A card is blocked by label, or by any of its comments matching the blocker pattern
+    comments = frame["comments"].explode().dropna().astype(str)
+    blocked_by_comment = comments.str.contains(BLOCKER_PATTERN, case=False, regex=True).groupby(level=0).any()
+    blocked_by_label = labels.str.contains("block").groupby(level=0).any()
+    frame["blocked"] = (
+        blocked_by_comment.reindex(frame.index, fill_value=False) | blocked_by_label.reindex(frame.index, fill_value=False)
+    ) & ~frame["done"]
+    frame["stale"] = (frame["days_in_list"] > STALE_DAYS) & ~frame["done"]
+    frame["completed_recently"] = frame["done"] & (frame["days_in_list"] <= VELOCITY_DAYS)
+
+    # Attention order: blocked, then overdue (most late first), then urgent, then stale
+    frame["severity"] = frame["blocked"] * 1000 + frame["overdue"] * (100 + frame["days_overdue"].clip(upper=99)) + frame["urgent"] * 10 + frame["stale"]
+    attention = frame[frame["severity"] > 0].sort_values(["severity", "days_in_list"], ascending=False)
+
+    total = len(frame)
+    return {
+        "total_cards": total,
+        "done": int(frame["done"].sum()),
+        "progress": float(frame["done"].mean() * 100) if total else 0.0,
+        "overdue": int(frame["overdue"].sum()),
+        "blocked": int(frame["blocked"].sum()),
+        "urgent_open": int((frame["urgent"] & ~frame["done"]).sum()),
+        "stale": int(frame["stale"].sum()),
+        "completed_last_days": int(frame["completed_recently"].sum()),
+        "per_list": frame.groupby("list", sort=False).agg(
+            cards=("name", "size"),
+            overdue=("overdue", "sum"),
+            blocked=("blocked", "sum"),
+            median_days_in_list=("days_in_list", "median"),
+        ),
+        "labels": labels.value_counts(),
+        "attention": attention[["name", "list", "due", "days_overdue", "days_in_list", "blocked", "urgent", "stale"]],
+    }
+
+
+def format_metrics(metrics, max_rows=30):
+    """Markdown text for the prompt. The attention table is capped at max_rows, the counts cover every card."""
+    lines = [
+        f"- Cards: {metrics['total_cards']}, done: {metrics['done']} ({metrics['progress']:.0f}%)",
+        f"- Completed in the last {VELOCITY_DAYS} days: {metrics['completed_last_days']}",
+        f"- Overdue: {metrics['overdue']}, blocked: {metrics['blocked']}, urgent and open: {metrics['urgent_open']}, "
+        f"stale (no activity for more than {STALE_DAYS} days): {metrics['stale']}",
+        "",
+        "| List | Cards | Overdue | Blocked | Median days in list |",
+        "|---|---|---|---|---|",
+    ]
+    for list_name, row in metrics["per_list"].iterrows():
+        lines.append(f"| {list_name} | {int(row['cards'])} | {int(row['overdue'])} | {int(row['blocked'])} | {row['median_days_in_list']:.0f} |")
+    if len(metrics["labels"]):
+        lines += ["", "Labels: " + ", ".join(f"{label} ({count})" for label, count in metrics["labels"].items())]
+
+    attention = metrics["attention"]
+    if len(attention):
+        lines += [
+            "",
+            f"Cards needing attention ({len(attention)}, showing {min(len(attention), max_rows)}):",
+            "| Card | List | Due | Days overdue | Days in list | Flags |",
+            "|---|---|---|---|---|---|",
+        ]
+        for _, row in attention.head(max_rows).iterrows():
+            flags = ", ".join(flag for flag in ("blocked", "urgent", "stale") if row[flag]) or "-"
+            due = row["due"].strftime("%Y-%m-%d") if pd.notna(row["due"]) else "-"
+            lines.append(f"| {row['name']} | {row['list']} | {due} | {row['days_overdue']} | {row['days_in_list']} | {flags} |")
+    return "\n".join(lines)
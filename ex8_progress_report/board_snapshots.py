@@ -0,0 +1,123 @@
+import json, sqlite3, threading, time
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS cards ("
+    "board_id TEXT NOT NULL, card_id TEXT NOT NULL, last_activity TEXT, comment_ids TEXT NOT NULL, "
+    "card TEXT NOT NULL, PRIMARY KEY (board_id, card_id))",
+    "CREATE TABLE IF NOT EXISTS reports ("
+    "board_id TEXT NOT NULL, created_at REAL NOT NULL, report TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_reports_board ON reports (board_id, created_at)",
+)
+
+
+def comments_of(card):
+    return [action for action in card.get("actions") or [] if action.get("type", "commentCard") == "commentCard"]
+
+
+class BoardSnapshotStore:
+    """
+    Local SQLite snapshot of a Trello board and of the last report written for it.
+    A card is considered changed when its dateLastActivity moved since the snapshot, and only
+    the comments that were not in the snapshot are reported as new. The snapshot is committed
+    after the report is written, so a failed run reports the same changes again next time.
+    """
+
+    def __init__(self, path="board_snapshots.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        with self._connection:
+            for statement in SCHEMA:
+                self._connection.execute(statement)
+
+    def _snapshot(self, board_id):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT card_id, last_activity, comment_ids, card FROM cards WHERE board_id = ?", (board_id,)
+            ).fetchall()
+        return {card_id: (last_activity, set(json.loads(comment_ids)), card) for card_id, last_activity, comment_ids, card in rows}
+
+    def diff(self, board_id, cards):
+        """
+        Returns {"new": cards, "changed": cards with only their new comments, "removed": stored cards
+        no longer on the board, "unchanged": count}. On the first run every card is new.
+        """
+        snapshot = self._snapshot(board_id)
+        new, changed = [], []
+        for card in cards:
+            if card["id"] not in snapshot:
+                new.append(card)
+                continue
+            last_activity, seen_comments, _ = snapshot[card["id"]]
+            if card.get("dateLastActivity") != last_activity:
+                fresh_comments = [action for action in comments_of(card) if action["id"] not in seen_comments]
+                changed.append({**card, "actions": fresh_comments})
+        current_ids = {card["id"] for card in cards}
+        removed = [json.loads(card) for card_id, (_, _, card) in snapshot.items() if card_id not in current_ids]
+        return {
+            "new": new,
+            "changed": changed,
+            "removed": removed,
+            "unchanged": len(cards) - len(new) - len(changed),
+        }
+
+    def commit(self, board_id, cards):
+        # Replaces the snapshot of the board with the current cards
+        rows = [
+            (board_id, card["id"], card.get("dateLastActivity"), json.dumps([action["id"] for action in comments_of(card)]), json.dumps(card))
+            for card in cards
+        ]
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM cards WHERE board_id = ?", (board_id,))
+            self._connection.executemany("INSERT INTO cards VALUES (?, ?, ?, ?, ?)", rows)
+
+    def last_report(self, board_id):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT report FROM reports WHERE board_id = ? ORDER BY created_at DESC LIMIT 1", (board_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save_report(self, board_id, report):
+        with self._lock, self._connection:
+            self._connection.execute("INSERT INTO reports VALUES (?, ?, ?)", (board_id, time.time(), report))
+
+
+def list_names(cards, lists=None):
+    """
+    Maps list ids to list names, from the board lists (/1/boards/{id}/lists) when given.
+    Comments also carry the name of the list of their card, used for lists missing from `lists`.
+    """
+    names = {}
+    for card in cards:
+        for action in comments_of(card):
+            card_list = action.get("data", {}).get("list")
+            if card_list:
+                names[card_list["id"]] = card_list["name"]
+    names.update({card_list["id"]: card_list["name"] for card_list in lists or []})
+    return names
+
+
+def format_card(card, names):
+    labels = ", ".join(label.get("name") or label.get("color", "") for label in card.get("labels") or [])
+    line = f"- {card['name']} (list: {names.get(card['idList'], card['idList'])}"
+    if card.get("due"):
+        line += f", due: {card['due'][:10]}"
+    if labels:
+        line += f", labels: {labels}"
+    line += f", last activity: {(card.get('dateLastActivity') or '')[:10]})"
+    for action in comments_of(card):
+        author = action.get("memberCreator", {}).get("fullName", "unknown")
+        line += f"\n  - comment by {author} on {action.get('date', '')[:10]}: {action.get('data', {}).get('text', '')}"
+    return line
+
+
+def format_changes(changes, names):
+    # Compact text for the prompt, its length follows the activity on the board and not the board size
+    sections = []
+    for title, key in (("New cards", "new"), ("Updated cards (new comments only)", "changed"), ("Removed or archived cards", "removed")):
+        if changes[key]:
+            sections.append(f"{title}:\n" + "\n".join(format_card(card, names) for card in changes[key]))
+    sections.append(f"Cards without activity since the previous report: {changes['unchanged']}")
+    return "\n\n".join(sections)
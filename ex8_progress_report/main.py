@@ -1,11 +1,16 @@
-from crewai import Agent, Task, Crew, LLM
+from crewai import Agent, Task, Crew
 from dotenv import load_dotenv, find_dotenv
 from typing import List
 from pydantic import BaseModel, Field
-import os, yaml, json
+import os, sys, yaml, json
 import warnings
 warnings.filterwarnings('ignore')
 
+# Shared modules (usage_metrics, helpers, ...) live in the repository root
+sys.path.append('..')
+from usage_metrics import UsageTracker
+from model_router import create_llm
+
 # Load environment variables from .env file
 _ = load_dotenv(find_dotenv())
 # Set the Gemini API key from environment variables
@@ -19,7 +24,8 @@ with open(file_path, "r") as file:
 # Convert the credentials to a JSON string
 vertex_credentials_json = json.dumps(vertex_credentials)
 
-llm = LLM(
+# Each call is routed to gemini-2.0-flash-lite or gemini-2.0-flash, see model_router.py (MODEL_ROUTING=off disables it)
+llm = create_llm(
         model="gemini/gemini-2.0-flash",
         temperature=0.5,
         max_tokens=5000, # might need to be increased since the tasks are more complex
@@ -43,73 +49,42 @@ for config_type, file_path in files.items():
 agents_config = configs['agents']
 tasks_config = configs['tasks']
 
-# Create custom tools that inherit from BaseTool class to fetch Trello board data & card data
-# Every Tool needs to have a name and a description
-# Tool can be assigned to an agent or can be assigned limited to a specific task
-from crewai_tools import BaseTool
-import requests
-
-class BoardDataFetcherTool(BaseTool):
-    name: str = "Trello Board Data Fetcher"
-    description: str = "Fetches card data, comments, and activity from a Trello board."
-
-    api_key: str = os.environ['TRELLO_API_KEY']
-    api_token: str = os.environ['TRELLO_API_TOKEN']
-    board_id: str = os.environ['TRELLO_BOARD_ID']
-
-    def _run(self) -> dict:
-        """
-        Fetch all cards from the specified Trello board.
-        """
-        # Uses an environment variable DLAI_TRELLO_BASE_URL if available, otherwise defaults to https://api.trello.com.
-        url = f"{os.getenv('DLAI_TRELLO_BASE_URL', 'https://api.trello.com')}/1/boards/{self.board_id}/cards"
-
-        query = {
-            'key': self.api_key,
-            'token': self.api_token,
-            # These parameters tell Trello's API what data you want:
-            'fields': 'name,idList,due,dateLastActivity,labels',
-            'attachments': 'true',
-            'actions': 'commentCard'
-        }
-
-        # Sends a GET request to Trello’s API with your board ID and API key/token.
-        response = requests.get(url, params=query)
-
-        # If the response was successful (200 OK), the method returns the JSON data from Trello.
-        # If not, it returns a hardcoded fallback JSON string representing sample Trello card data.
-        if response.status_code == 200:
-            return response.json()
-        else:
-            # Fallback in case of timeouts or other issues
-            return json.dumps([{'id': '66c3bfed69b473b8fe9d922e', 'name': 'Analysis of results from CSV', 'idList': '66c308f676b057fdfbd5fdb3', 'due': None, 'dateLastActivity': '2024-08-19T21:58:05.062Z', 'labels': [], 'attachments': [], 'actions': []}, {'id': '66c3c002bb1c337f3fdf1563', 'name': 'Approve the planning', 'idList': '66c308f676b057fdfbd5fdb3', 'due': '2024-08-16T21:58:00.000Z', 'dateLastActivity': '2024-08-19T21:58:57.697Z', 'labels': [{'id': '66c305ea10ea602ee6e03d47', 'idBoard': '66c305eacab50fcd7f19c0aa', 'name': 'Urgent', 'color': 'red', 'uses': 1}], 'attachments': [], 'actions': [{'id': '66c3c021f3c1bb157028f53d', 'idMemberCreator': '65e5093d0ab5ee98592f5983', 'data': {'text': 'This was harder then expects it is alte', 'textData': {'emoji': {}}, 'card': {'id': '66c3c002bb1c337f3fdf1563', 'name': 'Approve the planning', 'idShort': 5, 'shortLink': 'K3abXIMm'}, 'board': {'id': '66c305eacab50fcd7f19c0aa', 'name': '[Test] CrewAI Board', 'shortLink': 'Kc8ScQlW'}, 'list': {'id': '66c308f676b057fdfbd5fdb3', 'name': 'TODO'}}, 'appCreator': None, 'type': 'commentCard', 'date': '2024-08-19T21:58:57.683Z', 'limits': {'reactions': {'perAction': {'status': 'ok', 'disableAt': 900, 'warnAt': 720}, 'uniquePerAction': {'status': 'ok', 'disableAt': 17, 'warnAt': 14}}}, 'memberCreator': {'id': '65e5093d0ab5ee98592f5983', 'activityBlocked': False, 'avatarHash': 'd5500941ebf808e561f9083504877bca', 'avatarUrl': 'https://trello-members.s3.amazonaws.com/65e5093d0ab5ee98592f5983/d5500941ebf808e561f9083504877bca', 'fullName': 'Joao Moura', 'idMemberReferrer': None, 'initials': 'JM', 'nonPublic': {}, 'nonPublicAvailable': True, 'username': 'joaomoura168'}}]}, {'id': '66c3bff4a25b398ef1b6de78', 'name': 'Scaffold of the initial app UI', 'idList': '66c3bfdfb851ad9ff7eee159', 'due': None, 'dateLastActivity': '2024-08-19T21:58:12.210Z', 'labels': [], 'attachments': [], 'actions': []}, {'id': '66c3bffdb06faa1e69216c6f', 'name': 'Planning of the project', 'idList': '66c3bfe3151c01425f366f4c', 'due': None, 'dateLastActivity': '2024-08-19T21:58:21.081Z', 'labels': [], 'attachments': [], 'actions': []}])
-
-
-class CardDataFetcherTool(BaseTool):
-  name: str = "Trello Card Data Fetcher"
-  description: str = "Fetches card data from a Trello board."
-
-  api_key: str = os.environ['TRELLO_API_KEY']
-  api_token: str = os.environ['TRELLO_API_TOKEN']
-
-  def _run(self, card_id: str) -> dict:
-    url = f"{os.getenv('DLAI_TRELLO_BASE_URL', 'https://api.trello.com')}/1/cards/{card_id}"
-    query = {
-      'key': self.api_key,
-      'token': self.api_token
-    }
-    response = requests.get(url, params=query)
-
-    if response.status_code == 200:
-      return response.json()
-    else:
-      # Fallback in case of timeouts or other issues
-      return json.dumps({"error": "Failed to fetch card data, don't try to fetch any trello data anymore"})
-    
+# Custom tools to fetch Trello board data & card data, see trello_tools.py
+# Set DLAI_TRELLO_BASE_URL to the address of trello_mock_server.py to run offline
+from trello_tools import BoardDataFetcherTool, BoardListsFetcherTool, CardDataFetcherTool, load_fixture
+from board_snapshots import BoardSnapshotStore, format_changes, list_names
+from board_metrics import compute_metrics, format_metrics
+
+# The board is fetched once here and compared with the snapshot of the previous report,
+# so the agents only read the activity since then and not the whole board
+board_tool = BoardDataFetcherTool()
+snapshot_store = BoardSnapshotStore("board_snapshots.db")
+
+def as_list(result, fixture):
+  # The tools return a list, the fixture as a JSON string when Trello can't be reached,
+  # or an error message (e.g. a timeout): anything that isn't a list falls back to the fixture
+  if isinstance(result, list):
+    return result
+  try:
+    parsed = json.loads(result)
+  except (TypeError, ValueError):
+    parsed = None
+  return parsed if isinstance(parsed, list) else json.loads(load_fixture(fixture))
+
+board = board_tool.run()
+fetched = isinstance(board, list)
+cards = as_list(board, 'board_cards.json')
+# List names (done lists, per-list progress) come from the board lists, the cards only have list ids
+names = list_names(cards, as_list(BoardListsFetcherTool().run(), 'board_lists.json'))
+changes = snapshot_store.diff(board_tool.board_id, cards)
+previous_report = snapshot_store.last_report(board_tool.board_id)
+# Overdue cards, time in list, labels and blockers are computed over the whole board, not inferred by the LLM
+board_metrics = format_metrics(compute_metrics(cards, names))
+
 # Creating Agents
 data_collection_agent = Agent(
   config=agents_config['data_collection_agent'],
-  tools=[BoardDataFetcherTool(), CardDataFetcherTool()],
+  tools=[CardDataFetcherTool()],
   llm=llm
 )
 
@@ -127,13 +102,13 @@ data_collection = Task(
 data_analysis = Task(
   config=tasks_config['data_analysis'],
   agent=analysis_agent,
-  context=data_collection
+  context=[data_collection]
 )
 
 report_generation = Task(
   config=tasks_config['report_generation'],
   agent=analysis_agent,
-  context=data_analysis
+  context=[data_analysis]
 )
 
 # Creating Crew
@@ -151,4 +126,24 @@ crew = Crew(
 )
 
 # Kick off the crew and execute the process
-result = crew.kickoff()
\ No newline at end of file
+# Track tokens, latency and cost of every LLM call, tagged by crew, agent, task and model
+usage_tracker = UsageTracker(crew_name="progress_report")
+if previous_report and not (changes["new"] or changes["changed"] or changes["removed"]):
+  # No activity since the previous report, nothing to analyze
+  print("No activity on the board since the previous report, reusing it.")
+  report = previous_report
+else:
+  result = crew.kickoff(inputs={
+    "board_changes": format_changes(changes, names),
+    "board_metrics": board_metrics,
+    "previous_report": previous_report or "No previous report, this is the first one.",
+  })
+  report = result.raw
+  # Saved only after a successful run, a failed run reports the same changes next time
+  snapshot_store.save_report(board_tool.board_id, report)
+  if fetched:
+    snapshot_store.commit(board_tool.board_id, cards)
+
+# Show which agents and models burn the budget and latency
+usage_tracker.print_summary()
+usage_tracker.export_jsonl("usage_metrics.jsonl")
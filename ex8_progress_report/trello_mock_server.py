@@ -0,0 +1,240 @@
+"""
+Local stand-in for the parts of the Trello API used by the progress report crew.
+
+    python trello_mock_server.py --cards 1000 --latency 0.2 --failure-rate 0.05
+    DLAI_TRELLO_BASE_URL=http://127.0.0.1:8765 python main.py
+
+Boards are generated with a fixed seed (10 to 10,000 cards or more), or replayed from a fixture
+with --fixture fixtures/board_cards.json. Latency and failures (500 or 429) are injected per request.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlparse
+import argparse, json, os, random, re, threading, time
+
+LISTS = ["Backlog", "TODO", "In Progress", "Review", "Done"]
+LABELS = [("Urgent", "red"), ("Blocked", "orange"), ("Bug", "purple"), ("Feature", "green"), ("Tech debt", "yellow")]
+MEMBERS = ["Joao Moura", "Ana Silva", "Liam Chen", "Priya Patel", "Marc Dubois", "Sara Khan"]
+VERBS = ["Implement", "Design", "Review", "Fix", "Test", "Document", "Refactor", "Deploy", "Plan", "Approve"]
+SUBJECTS = [
+    "the login flow", "the CSV import", "the analytics dashboard", "the payment API", "the onboarding emails",
+    "the search index", "the mobile layout", "the release pipeline", "the data model", "the initial app UI",
+]
+COMMENTS = [
+    "Waiting on the API keys from the client.", "This was harder than expected, needs another day.",
+    "Blocked by the database migration.", "Done on my side, ready for review.", "Can someone pair on this?",
+    "Scope changed after the last meeting.", "Tests are failing on CI.", "Moved to next sprint.",
+]
+
+
+def _id(rng):
+    return "".join(rng.choice("0123456789abcdef") for _ in range(24))
+
+
+def _date(moment):
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def generate_board(cards=100, seed=0, now=None):
+    """Returns {"board", "lists", "cards"} shaped like Trello's API responses. Same seed, same board."""
+    rng = random.Random(seed)
+    now = now or datetime(2024, 8, 19, 22, 0, tzinfo=timezone.utc)
+    board = {"id": _id(rng), "name": f"[Mock] Project board ({cards} cards)", "shortLink": "MockBrd1"}
+    lists = [{"id": _id(rng), "name": name, "idBoard": board["id"]} for name in LISTS]
+    labels = [{"id": _id(rng), "idBoard": board["id"], "name": name, "color": color, "uses": 0} for name, color in LABELS]
+    members = [{"id": _id(rng), "fullName": name, "username": name.lower().replace(" ", "")} for name in MEMBERS]
+
+    generated = []
+    for index in range(cards):
+        card_list = rng.choices(lists, weights=[2, 3, 2, 1, 3])[0]
+        last_activity = now - timedelta(hours=rng.uniform(0, 24 * 30))
+        card_labels = rng.sample(labels, k=rng.choices([0, 1, 2], weights=[5, 4, 1])[0])
+        due = now + timedelta(days=rng.uniform(-10, 20)) if rng.random() < 0.6 else None
+        card = {
+            "id": _id(rng),
+            "name": f"{rng.choice(VERBS)} {rng.choice(SUBJECTS)} #{index + 1}",
+            "idList": card_list["id"],
+            "due": _date(due) if due else None,
+            "dateLastActivity": _date(last_activity),
+            "labels": card_labels,
+            "attachments": [],
+            "actions": [],
+        }
+        for _ in range(rng.choices([0, 1, 2, 3], weights=[5, 3, 1, 1])[0]):
+            member = rng.choice(members)
+            card["actions"].append({
+                "id": _id(rng),
+                "idMemberCreator": member["id"],
+                "type": "commentCard",
+                "date": _date(last_activity - timedelta(minutes=rng.uniform(0, 600))),
+                "data": {
+                    "text": rng.choice(COMMENTS),
+                    "card": {"id": card["id"], "name": card["name"]},
+                    "board": {"id": board["id"], "name": board["name"]},
+                    "list": {"id": card_list["id"], "name": card_list["name"]},
+                },
+                "memberCreator": {"id": member["id"], "fullName": member["fullName"], "username": member["username"]},
+            })
+        generated.append(card)
+    return {"board": board, "lists": lists, "cards": generated}
+
+
+def load_board(fixture_path):
+    # Replays recorded cards, e.g. fixtures/board_cards.json, with the recorded lists next to them (board_lists.json)
+    with open(fixture_path, "r") as file:
+        cards = json.load(file)
+    lists = {}
+    lists_path = os.path.join(os.path.dirname(fixture_path), "board_lists.json")
+    if os.path.exists(lists_path):
+        with open(lists_path, "r") as file:
+            lists = {card_list["id"]: card_list["name"] for card_list in json.load(file)}
+    for card in cards:
+        for action in card.get("actions", []):
+            if "list" in action.get("data", {}):
+                lists.setdefault(action["data"]["list"]["id"], action["data"]["list"]["name"])
+        lists.setdefault(card["idList"], card["idList"])
+    return {
+        "board": {"id": "fixture", "name": f"[Fixture] {fixture_path}"},
+        "lists": [{"id": list_id, "name": name} for list_id, name in lists.items()],
+        "cards": cards,
+    }
+
+
+def _select(card, query):
+    # Honours the `fields`, `attachments` and `actions` parameters, like Trello, so payload sizes are realistic
+    fields = query.get("fields", ["all"])[0]
+    selected = dict(card) if fields == "all" else {"id": card["id"], **{field: card.get(field) for field in fields.split(",")}}
+    if query.get("attachments", ["false"])[0] == "true":
+        selected["attachments"] = card.get("attachments", [])
+    if "actions" in query:
+        selected["actions"] = card.get("actions", [])
+    return selected
+
+
+class TrelloMockHandler(BaseHTTPRequestHandler):
+    routes = [
+        (re.compile(r"^/1/boards/([^/]+)/cards/?$"), "board_cards"),
+        (re.compile(r"^/1/boards/([^/]+)/lists/?$"), "board_lists"),
+        (re.compile(r"^/1/cards/([^/]+)/?$"), "card"),
+        (re.compile(r"^/__stats$"), "stats"),
+    ]
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        for pattern, route in self.routes:
+            match = pattern.match(url.path)
+            if match:
+                break
+        else:
+            return self._send(404, {"message": "not found"})
+
+        if route == "stats":
+            return self._send(200, self.server.stats)
+        server = self.server
+        with server.lock:
+            server.stats["requests"] += 1
+            rng_value, jitter = server.rng.random(), server.rng.uniform(-1, 1)
+        card_count = len(server.board["cards"]) if route == "board_cards" else 1
+        time.sleep(max(server.latency * (1 + server.jitter * jitter) + server.latency_per_card * card_count, 0))
+        if rng_value < server.failure_rate:
+            with server.lock:
+                server.stats["failures"] += 1
+            # Half server errors, half rate limiting, the two failures the tools have to survive
+            if rng_value < server.failure_rate / 2:
+                return self._send(500, {"message": "Internal server error"})
+            return self._send(429, {"message": "API_TOKEN_LIMIT_EXCEEDED"})
+
+        if route == "board_cards":
+            return self._send(200, [_select(card, query) for card in server.board["cards"]])
+        if route == "board_lists":
+            return self._send(200, server.board["lists"])
+        card = server.cards_by_id.get(match.group(1))
+        if card is None:
+            return self._send(404, {"message": "The requested resource was not found."})
+        return self._send(200, card)
+
+
+class TrelloMockServer(ThreadingHTTPServer):
+    """
+    Trello-compatible HTTP server: /1/boards/{id}/cards, /1/boards/{id}/lists and /1/cards/{id}.
+    Every request waits latency seconds (+/- jitter, + latency_per_card for each card returned)
+    and fails with probability failure_rate. /__stats returns the request and failure counts.
+    Any board id, key and token are accepted.
+    """
+    daemon_threads = True
+
+    def __init__(self, cards=100, latency=0.0, jitter=0.0, latency_per_card=0.0, failure_rate=0.0,
+                 fixture=None, seed=0, host="127.0.0.1", port=8765, verbose=False):
+        super().__init__((host, port), TrelloMockHandler)
+        self.board = load_board(fixture) if fixture else generate_board(cards, seed)
+        self.cards_by_id = {card["id"]: card for card in self.board["cards"]}
+        self.latency = latency
+        self.jitter = jitter
+        self.latency_per_card = latency_per_card
+        self.failure_rate = failure_rate
+        self.verbose = verbose
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "failures": 0}
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        # Serves from a background thread, for load tests running in the same process
+        self._thread = threading.Thread(target=self.serve_forever, name="trello-mock", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Trello API stand-in for the progress report crew.")
+    parser.add_argument("--cards", type=int, default=100, help="Number of generated cards.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Relative latency variation, e.g. 0.3 for +/-30%%.")
+    parser.add_argument("--latency-per-card", type=float, default=0.0, help="Seconds added per card returned.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests answered with 500 or 429.")
+    parser.add_argument("--fixture", help="Replay the cards of a JSON fixture instead of generating them.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+    args = parser.parse_args()
+
+    server = TrelloMockServer(
+        cards=args.cards, latency=args.latency, jitter=args.jitter, latency_per_card=args.latency_per_card,
+        failure_rate=args.failure_rate, fixture=args.fixture, seed=args.seed, host=args.host, port=args.port,
+        verbose=args.verbose,
+    )
+    print(f"Mock Trello board with {len(server.board['cards'])} cards on {server.base_url}")
+    print(f"Run the crew with: DLAI_TRELLO_BASE_URL={server.base_url} python main.py")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,121 @@
+from pydantic import BaseModel, Field
+from typing import Type
+import os, sys, json
+
+# Shared modules (async_tools, ...) live in the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Recorded Trello responses, returned when the API cannot be reached and replayed by trello_mock_server.py
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+def load_fixture(name):
+  with open(os.path.join(FIXTURES_DIR, name), 'r') as file:
+    return file.read()
+
+# Create custom tools that inherit from AsyncBaseTool class to fetch Trello board data & card data
+# Every Tool needs to have a name, a description and, for async tools, an args_schema
+# Tool can be assigned to an agent or can be assigned limited to a specific task
+# The HTTP calls run on a shared event loop with a per-tool concurrency limit and timeout,
+# so many crews fetching Trello data at once don't each block a worker thread
+from async_tools import AsyncBaseTool, get_http_client
+import httpx
+
+class BoardDataFetcherInput(BaseModel):
+    pass
+
+class CardDataFetcherInput(BaseModel):
+    card_id: str = Field(..., description="The id of the Trello card to fetch.")
+
+class BoardDataFetcherTool(AsyncBaseTool):
+    name: str = "Trello Board Data Fetcher"
+    description: str = "Fetches card data, comments, and activity from a Trello board."
+    args_schema: Type[BaseModel] = BoardDataFetcherInput
+
+    api_key: str = os.environ['TRELLO_API_KEY']
+    api_token: str = os.environ['TRELLO_API_TOKEN']
+    board_id: str = os.environ['TRELLO_BOARD_ID']
+
+    async def _arun(self) -> dict:
+        """
+        Fetch all cards from the specified Trello board.
+        """
+        # Uses an environment variable DLAI_TRELLO_BASE_URL if available, otherwise defaults to https://api.trello.com.
+        url = f"{os.getenv('DLAI_TRELLO_BASE_URL', 'https://api.trello.com')}/1/boards/{self.board_id}/cards"
+
+        query = {
+            'key': self.api_key,
+            'token': self.api_token,
+            # These parameters tell Trello's API what data you want:
+            'fields': 'name,idList,due,dateLastActivity,labels',
+            'attachments': 'true',
+            'actions': 'commentCard'
+        }
+
+        # Sends a GET request to Trello’s API with your board ID and API key/token.
+        try:
+            response = await get_http_client().get(url, params=query)
+        except httpx.HTTPError:
+            response = None
+
+        # If the response was successful (200 OK), the method returns the JSON data from Trello.
+        # If not, it returns a hardcoded fallback JSON string representing sample Trello card data.
+        if response is not None and response.status_code == 200:
+            return response.json()
+        else:
+            # Fallback in case of timeouts or other issues
+            return load_fixture('board_cards.json')
+
+
+class BoardListsFetcherTool(AsyncBaseTool):
+  name: str = "Trello Board Lists Fetcher"
+  description: str = "Fetches the id and name of every list of a Trello board."
+  args_schema: Type[BaseModel] = BoardDataFetcherInput
+
+  api_key: str = os.environ['TRELLO_API_KEY']
+  api_token: str = os.environ['TRELLO_API_TOKEN']
+  board_id: str = os.environ['TRELLO_BOARD_ID']
+
+  async def _arun(self) -> list:
+    # The cards only carry the id of their list, the names come from this endpoint
+    url = f"{os.getenv('DLAI_TRELLO_BASE_URL', 'https://api.trello.com')}/1/boards/{self.board_id}/lists"
+    query = {
+      'key': self.api_key,
+      'token': self.api_token,
+      'fields': 'name,closed'
+    }
+    try:
+      response = await get_http_client().get(url, params=query)
+    except httpx.HTTPError:
+      response = None
+
+    if response is not None and response.status_code == 200:
+      return response.json()
+    else:
+      # Fallback in case of timeouts or other issues, the lists of the board_cards.json fixture
+      return load_fixture('board_lists.json')
+
+
+class CardDataFetcherTool(AsyncBaseTool):
+  name: str = "Trello Card Data Fetcher"
+  description: str = "Fetches card data from a Trello board."
+  args_schema: Type[BaseModel] = CardDataFetcherInput
+
+  api_key: str = os.environ['TRELLO_API_KEY']
+  api_token: str = os.environ['TRELLO_API_TOKEN']
+
+  async def _arun(self, card_id: str) -> dict:
+    url = f"{os.getenv('DLAI_TRELLO_BASE_URL', 'https://api.trello.com')}/1/cards/{card_id}"
+    query = {
+      'key': self.api_key,
+      'token': self.api_token
+    }
+    try:
+      response = await get_http_client().get(url, params=query)
+    except httpx.HTTPError:
+      response = None
+
+    if response is not None and response.status_code == 200:
+      return response.json()
+    else:
+      # Fallback in case of timeouts or other issues
+      return json.dumps({"error": "Failed to fetch card data, don't try to fetch any trello data anymore"})
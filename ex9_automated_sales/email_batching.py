@@ -0,0 +1,122 @@
+import re
+
+ROLE_FAMILIES = {
+  "executive": {"ceo", "cto", "cio", "coo", "chief", "founder", "cofounder", "president", "vp", "vice", "owner"},
+  "engineering": {"engineering", "engineer", "developer", "architect", "technology", "technical", "devops", "software"},
+  "data": {"data", "ai", "ml", "analytics", "scientist", "intelligence"},
+  "product": {"product", "design", "ux"},
+  "operations": {"operations", "ops", "process", "support", "customer"},
+  "sales & marketing": {"sales", "marketing", "growth", "revenue", "business"},
+}
+
+
+def role_family(job_title):
+  words = set(re.findall(r"[a-z]+", (job_title or "").lower()))
+  # The first family in the order above wins, e.g. "VP of Engineering" is an executive
+  for family, keywords in ROLE_FAMILIES.items():
+    if words & keywords:
+      return family
+  return "other"
+
+
+def score_band(score):
+  if score >= 90:
+    return "90-100"
+  if score >= 80:
+    return "80-89"
+  return "below 80"
+
+
+def cluster_key(lead):
+  # (industry, role family, score band) of a LeadScoringResult
+  return (
+    lead.company_info.industry.strip().lower(),
+    role_family(lead.personal_info.job_title),
+    score_band(lead.lead_score.score),
+  )
+
+
+def cluster_leads(leads):
+  # Groups the leads by cluster key, in order of first appearance
+  clusters = {}
+  for lead in leads:
+    clusters.setdefault(cluster_key(lead), []).append(lead)
+  return clusters
+
+
+def cluster_profile(key, leads):
+  industry, role, band = key
+  criteria = sorted({criterion for lead in leads for criterion in lead.lead_score.scoring_criteria})
+  titles = sorted({lead.personal_info.job_title for lead in leads})
+  return (
+    f"- Industry: {industry}\n"
+    f"- Role: {role} ({', '.join(titles)})\n"
+    f"- Lead score: {band}\n"
+    f"- Number of leads: {len(leads)}\n"
+    f"- What made them qualified: {'; '.join(criteria[:10])}"
+  )
+
+
+def personalize(template, lead, hook=""):
+  # Deterministic substitution, no LLM call
+  values = {
+    "[FIRST_NAME]": lead.personal_info.name.split()[0] if lead.personal_info.name.strip() else "there",
+    "[JOB_TITLE]": lead.personal_info.job_title,
+    "[COMPANY]": lead.company_info.company_name,
+    "[INDUSTRY]": lead.company_info.industry,
+    "[HOOK]": hook,
+  }
+  email = template
+  for placeholder, value in values.items():
+    email = email.replace(placeholder, value)
+  # An empty hook leaves its line blank
+  return re.sub(r"\n{3,}", "\n\n", email).strip()
+
+
+class EmailBatcher:
+  """
+  Writes emails for a batch of leads with one template per cluster of similar leads
+  (same industry, role family and score band) instead of two heavy crew calls per lead.
+  The template crew drafts and optimizes each template once, then every lead gets it by
+  placeholder substitution. With `llm`, each lead also gets a one-sentence personal hook
+  from a single short LLM call, so there is at most one light call per lead.
+  """
+
+  def __init__(self, template_crew, llm=None):
+    self.template_crew = template_crew
+    self.llm = llm
+    self.stats = {"leads": 0, "templates": 0, "hook_calls": 0}
+
+  def hook(self, lead):
+    if self.llm is None or not lead.personal_info.professional_background:
+      return ""
+    self.stats["hook_calls"] += 1
+    answer = self.llm.call([{"role": "user", "content": (
+      "Write one short, friendly opening sentence for a sales email to "
+      f"{lead.personal_info.name}, {lead.personal_info.job_title} at {lead.company_info.company_name}, "
+      f"referring to their background: {lead.personal_info.professional_background}\n"
+      "Answer with the sentence only."
+    )}])
+    return answer.strip().strip('"')
+
+  def write(self, leads):
+    # Returns one dict per lead with the email and the cluster it was written from, in the order of leads
+    clusters = cluster_leads(leads)
+    keys = list(clusters)
+    templates = self.template_crew.kickoff_for_each([
+      {"cluster_profile": cluster_profile(key, clusters[key])} for key in keys
+    ])
+    template_of = {key: template.raw for key, template in zip(keys, templates)}
+    self.stats["leads"] += len(leads)
+    self.stats["templates"] += len(keys)
+
+    emails = []
+    for lead in leads:
+      key = cluster_key(lead)
+      emails.append({
+        "name": lead.personal_info.name,
+        "company": lead.company_info.company_name,
+        "cluster": " / ".join(key),
+        "email": personalize(template_of[key], lead, self.hook(lead)),
+      })
+    return emails
@@ -0,0 +1,120 @@
+import json, os, re
+import numpy as np
+
+# Ideal customer profile as keyword weights, used as the initial weights of the linear model
+TITLE_KEYWORDS = {
+  "chief": 3.0, "ceo": 3.0, "cto": 3.0, "cio": 3.0, "coo": 2.5, "founder": 3.0, "cofounder": 3.0,
+  "vp": 2.5, "vice": 2.5, "president": 2.5, "head": 2.0, "director": 2.0, "principal": 1.5,
+  "lead": 1.0, "manager": 1.0, "architect": 1.0, "senior": 0.5,
+  "engineering": 1.5, "technology": 1.5, "data": 1.5, "ai": 1.5, "ml": 1.5, "product": 1.0,
+  "operations": 0.5, "it": 0.5, "innovation": 1.0, "digital": 0.5,
+  "intern": -3.0, "student": -3.0, "trainee": -2.0, "junior": -1.0, "assistant": -1.0, "freelance": -1.0,
+}
+USE_CASE_KEYWORDS = {
+  "ai": 1.5, "agent": 1.5, "agents": 1.5, "llm": 1.5, "automation": 1.5, "automate": 1.5, "workflow": 1.0,
+  "data": 1.0, "enrichment": 1.0, "pipeline": 1.0, "production": 1.0, "scale": 1.0, "team": 0.5,
+  "customer": 0.5, "sales": 0.5, "support": 0.5, "integration": 0.5, "enterprise": 1.0,
+  "homework": -3.0, "school": -2.0, "course": -1.5, "learning": -0.5, "personal": -1.5, "hobby": -2.0,
+  "test": -2.0, "testing": -1.0, "curious": -1.0, "free": -1.5, "job": -2.0,
+}
+FREE_EMAIL_DOMAINS = {"gmail.com", "yahoo.com", "hotmail.com", "outlook.com", "aol.com", "icloud.com", "proton.me", "protonmail.com"}
+# An empty job title or use case is not evidence against the lead: the missing flags give back
+# about what an average field would add, so a sparse lead with a business email is kept for the crew
+OTHER_FEATURES = {"business_email": 1.0, "has_company": 1.0, "use_case_words": 0.3, "title_missing": 1.5, "use_case_missing": 1.0}
+BIAS = -4.0
+
+
+def _words(text):
+  return set(re.findall(r"[a-z0-9]+", (text or "").lower()))
+
+
+class LeadPrefilter:
+  """
+  Cheap deterministic lead pre-scoring, run on the whole batch before any LLM call.
+  Every lead becomes a row of keyword and profile features (job title, use case, email domain,
+  company), and a logistic model gives the probability that the lead is qualified.
+  The initial weights encode the ideal customer profile; fit() learns them from past LLM scores.
+  Only leads below `threshold` are dropped, so the filter is meant to remove obviously
+  unqualified leads, not to replace the scoring crew. Missing fields are scored neutrally.
+  The feature rows are built lead by lead (keyword lookups), the scoring and fit() are
+  vectorized over the whole batch.
+  """
+
+  def __init__(self, threshold=0.2, weights_path=None):
+    self.columns = (
+      [f"title:{word}" for word in TITLE_KEYWORDS]
+      + [f"use_case:{word}" for word in USE_CASE_KEYWORDS]
+      + list(OTHER_FEATURES)
+    )
+    self.weights = np.array(list(TITLE_KEYWORDS.values()) + list(USE_CASE_KEYWORDS.values()) + list(OTHER_FEATURES.values()))
+    self.bias = BIAS
+    self.threshold = threshold
+    self.weights_path = weights_path
+    if weights_path and os.path.exists(weights_path):
+      with open(weights_path, "r") as file:
+        saved = json.load(file)
+      learned = saved["weights"]
+      # Columns added since the weights were saved keep their initial weight
+      self.weights = np.array([learned.get(column, weight) for column, weight in zip(self.columns, self.weights)])
+      self.bias = saved["bias"]
+
+  def features(self, leads):
+    # One row per lead, built in a Python loop over the leads; the scoring is a single matrix product over the batch
+    matrix = np.zeros((len(leads), len(self.columns)))
+    title_offset = 0
+    use_case_offset = len(TITLE_KEYWORDS)
+    other_offset = use_case_offset + len(USE_CASE_KEYWORDS)
+    title_index = {word: index for index, word in enumerate(TITLE_KEYWORDS)}
+    use_case_index = {word: index for index, word in enumerate(USE_CASE_KEYWORDS)}
+    for row, lead in enumerate(leads):
+      lead = lead.get("lead_data", lead)
+      for word in _words(lead.get("job_title")) & title_index.keys():
+        matrix[row, title_offset + title_index[word]] = 1.0
+      use_case = _words(lead.get("use_case"))
+      for word in use_case & use_case_index.keys():
+        matrix[row, use_case_offset + use_case_index[word]] = 1.0
+      domain = (lead.get("email") or "").rpartition("@")[2].lower()
+      matrix[row, other_offset] = float(bool(domain) and domain not in FREE_EMAIL_DOMAINS)
+      matrix[row, other_offset + 1] = float(bool((lead.get("company") or "").strip()))
+      # Saturates at ~20 words, a detailed use case is a good sign but not a decisive one
+      matrix[row, other_offset + 2] = np.log1p(len(use_case)) / np.log1p(20)
+      matrix[row, other_offset + 3] = float(not (lead.get("job_title") or "").strip())
+      matrix[row, other_offset + 4] = float(not use_case)
+    return matrix
+
+  def predict(self, leads):
+    # Probability of each lead being qualified
+    if not leads:
+      return np.zeros(0)
+    return 1.0 / (1.0 + np.exp(-(self.features(leads) @ self.weights + self.bias)))
+
+  def split(self, leads):
+    # Returns (kept leads, dropped leads with their pre-score 0-100)
+    probabilities = self.predict(leads)
+    kept = [lead for lead, probability in zip(leads, probabilities) if probability >= self.threshold]
+    dropped = [
+      {**lead, "prefilter_score": round(float(probability) * 100, 1)}
+      for lead, probability in zip(leads, probabilities) if probability < self.threshold
+    ]
+    return kept, dropped
+
+  def fit(self, leads, labels, epochs=500, learning_rate=0.1, l2=0.01):
+    """
+    Trains the weights by gradient descent on past leads, e.g. labels = LLM score > 70.
+    Starts from the current weights and regularizes towards them, so a few examples
+    adjust the ideal customer profile instead of replacing it.
+    """
+    features = self.features(leads)
+    labels = np.asarray(labels, dtype=float)
+    prior = self.weights.copy()
+    for _ in range(epochs):
+      probabilities = 1.0 / (1.0 + np.exp(-(features @ self.weights + self.bias)))
+      error = probabilities - labels
+      self.weights -= learning_rate * (features.T @ error / len(labels) + l2 * (self.weights - prior))
+      self.bias -= learning_rate * error.mean()
+    return self
+
+  def save(self, path=None):
+    path = path or self.weights_path
+    with open(path, "w") as file:
+      json.dump({"weights": dict(zip(self.columns, self.weights.tolist())), "bias": self.bias}, file, indent=2)
@@ -0,0 +1,112 @@
+from difflib import SequenceMatcher
+import hashlib, re, unicodedata
+from lead_prefilter import FREE_EMAIL_DOMAINS
+
+COMPANY_SUFFIXES = {"inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation", "co", "company", "gmbh", "sa", "sas", "ag", "plc", "the"}
+# Providers that ignore dots in the local part of the address
+DOTLESS_DOMAINS = {"gmail.com", "googlemail.com"}
+FIELDS = ("name", "job_title", "company", "email", "use_case")
+
+
+def _ascii_words(text):
+  text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode()
+  return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def normalize_email(email):
+  local, _, domain = (email or "").strip().lower().rpartition("@")
+  if not local or not domain:
+    return ""
+  local = local.split("+", 1)[0]
+  if domain in DOTLESS_DOMAINS:
+    local, domain = local.replace(".", ""), "gmail.com"
+  return f"{local}@{domain}"
+
+
+def normalize_name(name):
+  return " ".join(_ascii_words(name))
+
+
+def normalize_company(company):
+  return " ".join(word for word in _ascii_words(company) if word not in COMPANY_SUFFIXES)
+
+
+def lead_id(lead):
+  # Stable across runs and sources: the email when known, otherwise name and company
+  email = normalize_email(lead.get("email"))
+  key = email or f"{normalize_name(lead.get('name'))}|{normalize_company(lead.get('company'))}"
+  return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+class LeadResolver:
+  """
+  Merges the leads that describe the same person, e.g. when a lead arrives from several sources.
+  Exact matches are found with hash indexes on the normalized email and on name + company.
+  The remaining leads are compared by fuzzy name similarity, but only within their blocks:
+  same normalized company or same corporate email domain, and a name word in common, so the
+  blocks stay small. Free email domains (gmail.com, ...) say nothing about the person and
+  are never used as a block, and two leads with different companies are never merged.
+  """
+
+  def __init__(self, name_similarity=0.88):
+    self.name_similarity = name_similarity
+
+  def resolve(self, leads):
+    """
+    Returns one lead per person, in the order of first appearance, with a stable `lead_id`
+    (from the identity of its first record) and the number of `sources` merged into it. Missing fields are filled from the duplicates.
+    """
+    clusters = []
+    by_email, by_name_company, blocks = {}, {}, {}
+    for lead in leads:
+      data = dict(lead.get("lead_data", lead))
+      email = normalize_email(data.get("email"))
+      name = normalize_name(data.get("name"))
+      company = normalize_company(data.get("company"))
+      index = by_email.get(email) if email else None
+      if index is None and name:
+        index = by_name_company.get((name, company))
+      block_keys = _block_keys(name, company, email)
+      if index is None and name:
+        index = self._fuzzy_match(name, company, block_keys, blocks, clusters)
+
+      if index is None:
+        index = len(clusters)
+        # The id comes from the first record, so a duplicate that adds an email later doesn't change it
+        clusters.append({"lead_data": data, "sources": 1, "lead_id": lead_id(data)})
+      else:
+        merged = clusters[index]["lead_data"]
+        for field in FIELDS:
+          if not merged.get(field) and data.get(field):
+            merged[field] = data[field]
+        clusters[index]["sources"] += 1
+
+      if email:
+        by_email.setdefault(email, index)
+      if name:
+        by_name_company.setdefault((name, company), index)
+      for key in block_keys:
+        blocks.setdefault(key, set()).add(index)
+
+    return clusters
+
+  def _fuzzy_match(self, name, company, block_keys, blocks, clusters):
+    candidates = set().union(*(blocks.get(key, set()) for key in block_keys)) if block_keys else set()
+    best, best_ratio = None, self.name_similarity
+    for index in sorted(candidates):
+      other = clusters[index]["lead_data"]
+      other_company = normalize_company(other.get("company"))
+      # Same corporate domain but different companies, e.g. a group and its subsidiary: two people
+      if company and other_company and company != other_company:
+        continue
+      ratio = SequenceMatcher(None, name, normalize_name(other.get("name"))).ratio()
+      if ratio >= best_ratio:
+        best, best_ratio = index, ratio
+    return best
+
+
+def _block_keys(name, company, email):
+  # One key per name word and per company or corporate domain: fuzzy matches share at least one name word
+  domain = email.rpartition("@")[2]
+  groups = [f"company:{company}" if company else "", f"domain:{domain}" if domain and domain not in FREE_EMAIL_DOMAINS else ""]
+  return [f"{group}|{word}" for group in groups if group for word in set(name.split()) if len(word) > 1]
@@ -0,0 +1,134 @@
+import json, sqlite3, threading, time
+
+SCHEMA = (
+  "CREATE TABLE IF NOT EXISTS lead_scores ("
+  "lead_id TEXT PRIMARY KEY, email TEXT, name TEXT, company TEXT, "
+  "score INTEGER, result TEXT NOT NULL, scored_at REAL NOT NULL)",
+  # Leads of each flow run, so the filters of a run are queries and not lists held in memory
+  "CREATE TABLE IF NOT EXISTS batch_leads ("
+  "batch_id TEXT NOT NULL, lead_id TEXT NOT NULL, PRIMARY KEY (batch_id, lead_id))",
+  "CREATE INDEX IF NOT EXISTS idx_lead_scores_score ON lead_scores (score)",
+  "CREATE INDEX IF NOT EXISTS idx_lead_scores_company ON lead_scores (company COLLATE NOCASE, score)",
+  "CREATE INDEX IF NOT EXISTS idx_lead_scores_scored_at ON lead_scores (scored_at)",
+)
+UPSERT = (
+  "INSERT INTO lead_scores (lead_id, email, name, company, score, result, scored_at) "
+  "VALUES (?, ?, ?, ?, ?, ?, ?) "
+  "ON CONFLICT (lead_id) DO UPDATE SET email = excluded.email, name = excluded.name, "
+  "company = excluded.company, score = excluded.score, result = excluded.result, scored_at = excluded.scored_at"
+)
+
+
+class LeadScoreStore:
+  """
+  Durable SQLite store of lead scores, keyed by the lead_id of lead_resolution.
+  Runs in WAL mode so reads do not block the writer, writes are batched with executemany,
+  and scores are indexed by score and company. Scores younger than `freshness_days`
+  are reused instead of running the scoring crew again.
+  """
+
+  def __init__(self, path="lead_scores.db", freshness_days=30, batch_size=500):
+    self.path = path
+    self.freshness_seconds = freshness_days * 86400
+    self.batch_size = batch_size
+    self._lock = threading.Lock()
+    self._connection = sqlite3.connect(path, check_same_thread=False)
+    self._connection.execute("PRAGMA journal_mode=WAL")
+    # Safe with WAL: a crash can lose the last transactions but never corrupts the database
+    self._connection.execute("PRAGMA synchronous=NORMAL")
+    with self._connection:
+      for statement in SCHEMA:
+        self._connection.execute(statement)
+
+  def _chunks(self, rows):
+    for start in range(0, len(rows), self.batch_size):
+      yield rows[start:start + self.batch_size]
+
+  def get_fresh(self, lead_ids):
+    # Returns {lead_id: result dict} for the leads scored within the freshness window
+    fresh = {}
+    lead_ids = list(lead_ids)
+    for chunk in self._chunks(lead_ids):
+      placeholders = ",".join("?" * len(chunk))
+      with self._lock:
+        rows = self._connection.execute(
+          f"SELECT lead_id, result FROM lead_scores WHERE lead_id IN ({placeholders}) AND scored_at >= ?",
+          [*chunk, time.time() - self.freshness_seconds],
+        ).fetchall()
+      fresh.update((lead_id, json.loads(result)) for lead_id, result in rows)
+    return fresh
+
+  def upsert_many(self, rows, batch_id=None):
+    """
+    rows: (lead_id, lead_data, result) tuples, result being a LeadScoringResult or its dict.
+    Written in transactions of batch_size rows, and added to the batch when batch_id is given.
+    """
+    now = time.time()
+    records = []
+    for lead_id, lead_data, result in rows:
+      result = result.model_dump() if hasattr(result, "model_dump") else result
+      records.append((
+        lead_id, lead_data.get("email"), lead_data.get("name"), lead_data.get("company"),
+        result["lead_score"]["score"], json.dumps(result), now,
+      ))
+    for chunk in self._chunks(records):
+      with self._lock, self._connection:
+        self._connection.executemany(UPSERT, chunk)
+    if batch_id:
+      self.add_to_batch(batch_id, [record[0] for record in records])
+    return len(records)
+
+  def save(self, lead_id, lead_data, result):
+    self.upsert_many([(lead_id, lead_data, result)])
+
+  def add_to_batch(self, batch_id, lead_ids):
+    for chunk in self._chunks([(batch_id, lead_id) for lead_id in lead_ids]):
+      with self._lock, self._connection:
+        self._connection.executemany("INSERT OR IGNORE INTO batch_leads VALUES (?, ?)", chunk)
+
+  def _where(self, batch_id, min_score, max_score, company):
+    joins, conditions, parameters = "", [], []
+    if batch_id is not None:
+      joins = " JOIN batch_leads USING (lead_id)"
+      conditions.append("batch_leads.batch_id = ?")
+      parameters.append(batch_id)
+    if min_score is not None:
+      conditions.append("score >= ?")
+      parameters.append(min_score)
+    if max_score is not None:
+      conditions.append("score <= ?")
+      parameters.append(max_score)
+    if company is not None:
+      conditions.append("company = ? COLLATE NOCASE")
+      parameters.append(company)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return joins + where, parameters
+
+  def query(self, batch_id=None, min_score=None, max_score=None, company=None, limit=None):
+    """
+    Yields (lead_id, result dict) ordered by descending score. Rows are fetched in chunks,
+    so iterating over a large store does not load it in memory.
+    """
+    clause, parameters = self._where(batch_id, min_score, max_score, company)
+    sql = f"SELECT lead_id, result FROM lead_scores{clause} ORDER BY score DESC"
+    if limit is not None:
+      sql += " LIMIT ?"
+      parameters.append(limit)
+    # A separate cursor keeps its own position, other threads can use the connection in between
+    with self._lock:
+      cursor = self._connection.execute(sql, parameters)
+    while True:
+      with self._lock:
+        rows = cursor.fetchmany(self.batch_size)
+      if not rows:
+        return
+      for lead_id, result in rows:
+        yield lead_id, json.loads(result)
+
+  def count(self, batch_id=None, min_score=None, max_score=None, company=None):
+    clause, parameters = self._where(batch_id, min_score, max_score, company)
+    with self._lock:
+      return self._connection.execute(f"SELECT COUNT(*) FROM lead_scores{clause}", parameters).fetchone()[0]
+
+  def close(self):
+    self._connection.close()
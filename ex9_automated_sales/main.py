@@ -1,13 +1,25 @@
-from crewai import Agent, Task, Crew, LLM, Flow
-from crewai.flow.flow import start, listen, and_, or_, router
+from crewai import Agent, Task, Crew, Flow
+from crewai.flow.flow import start, listen, and_
 from crewai_tools import SerperDevTool, ScrapeWebsiteTool
 from dotenv import load_dotenv, find_dotenv
 from typing import List, Optional
 from pydantic import BaseModel, Field
-import os, yaml, json
+import os, sys, yaml, json, uuid
 import warnings
 warnings.filterwarnings('ignore')
 
+# Shared modules (model_router, usage_metrics, ...) live in the repository root
+sys.path.append('..')
+from model_router import create_llm
+from structured_output import with_structured_output
+from lead_prefilter import LeadPrefilter
+from lead_resolution import LeadResolver
+from lead_store import LeadScoreStore
+from email_batching import EmailBatcher
+from flow_concurrency import concurrent_step
+from micro_batching import MicroBatchRouter
+from flow_persistence import SQLiteFlowState, checkpoint, idempotency_key, once, once_each, run_id_of, state_lock
+
 # Load environment variables from .env file
 _ = load_dotenv(find_dotenv())
 # Set the Gemini API key from environment variables
@@ -21,8 +33,10 @@ with open(file_path, "r") as file:
 # Convert the credentials to a JSON string
 vertex_credentials_json = json.dumps(vertex_credentials)
 
-llm = LLM(
+# Lead scoring and emails run once per lead, so every call is routed to the cheapest model that gives a usable answer
+llm = create_llm(
         model="gemini/gemini-2.0-flash",
+        lite_model="gemini/gemini-2.0-flash-lite",
         temperature=0.5,
         max_tokens=5000, # might need to be increased since the tasks are more complex
         vertex_credentials=vertex_credentials_json
@@ -74,6 +88,30 @@ class LeadScoringResult(BaseModel):
     company_info: CompanyInfo = Field(..., description="Information about the lead's company.")
     lead_score: LeadScore = Field(..., description="The calculated score and related information for the lead.")
 
+def as_scoring_result(output):
+  # Crew outputs, stored JSON and models all become LeadScoringResult, so the flow handles one type
+  if isinstance(output, LeadScoringResult):
+    return output
+  if isinstance(output, dict):
+    return LeadScoringResult.model_validate(output)
+  if getattr(output, "pydantic", None) is not None:
+    return LeadScoringResult.model_validate(output.pydantic.model_dump())
+  return LeadScoringResult.model_validate(output.to_dict())
+
+# Scores are reused for 30 days, known leads are not scored again
+lead_score_store = LeadScoreStore(path="lead_scores.db", freshness_days=30)
+# Leads scoring above this are qualified and dispatched
+QUALIFIED_SCORE = 70
+
+def lead_tier(lead):
+  # Destination of a qualified lead in the dispatch router
+  if lead.lead_score.score >= 90:
+    return 'salesforce'
+  elif lead.lead_score.score >= 80:
+    return 'sales_team'
+  else:
+    return 'email'
+
 # Initialize the tools
 search_tool = SerperDevTool()
 scrape_tool = ScrapeWebsiteTool()
@@ -113,9 +151,10 @@ cultural_fit_task = Task(
 scoring_validation_task = Task(
   config=lead_tasks_config['lead_scoring_and_validation'],
   agent=scoring_validation_agent,
-  context=[lead_data_task, cultural_fit_task],
-  output_pydantic=LeadScoringResult
+  context=[lead_data_task, cultural_fit_task]
 )
+# The score is validated locally against LeadScoringResult, no extra LLM call to convert the answer
+scoring_validation_task = with_structured_output(scoring_validation_task, LeadScoringResult, llm=llm)
 
 # Creating Crew
 lead_scoring_crew = Crew(
@@ -168,12 +207,43 @@ email_writing_crew = Crew(
   verbose=True
 )
 
+# Template crew for batched emails: one template per cluster of similar leads, drafted and optimized once
+template_drafting = Task(
+  config=email_tasks_config['template_drafting'],
+  agent=email_content_specialist
+)
+
+template_optimization = Task(
+  config=email_tasks_config['template_optimization'],
+  agent=engagement_strategist
+)
+
+email_template_crew = Crew(
+  agents=[
+    email_content_specialist,
+    engagement_strategist
+  ],
+  tasks=[
+    template_drafting,
+    template_optimization
+  ],
+  verbose=True
+)
+
+# Leads are personalized by placeholder substitution plus one short hook call with the lite model
+email_batcher = EmailBatcher(email_template_crew, llm=llm.lite_llm)
+
+# Steps results and state snapshots are saved after each step, a restarted run resumes after the last completed one
+# JSONLFlowState("flow_state.jsonl") is the append-only log alternative
+flow_state = SQLiteFlowState("flow_state.db")
+
 # Create a Flow
 # Flow allows you to run Python code in between the tasks and agents.
 # This is useful for data transformation, validation, or any other processing that needs to happen between tasks.
 class SalesPipeline(Flow):
     
   @start()
+  @checkpoint(flow_state)
   def fetch_leads(self):
     # Pull our leads from the database
     # This is a mock, in a real-world scenario, this is where we would
@@ -188,69 +258,169 @@ class SalesPipeline(Flow):
           "use_case": "Using AI Agent to do better data enrichment."
         },
       },
+      {
+        # Same lead from another source, merged by entity resolution
+        "lead_data": {
+          "name": "Joao Moura",
+          "job_title": "",
+          "company": "Clearbit Inc.",
+          "email": "Joao@Clearbit.com",
+          "use_case": ""
+        },
+      },
+      {
+        "lead_data": {
+          "name": "Sam Taylor",
+          "job_title": "Student",
+          "company": "",
+          "email": "sam.taylor@gmail.com",
+          "use_case": "Homework for a course."
+        },
+      },
     ]
     return leads
 
   @listen(fetch_leads)
+  @checkpoint(flow_state)
+  def resolve_leads(self, leads):
+    # The same person can arrive from several sources: merge them into one lead with a stable lead_id
+    resolved = LeadResolver().resolve(leads)
+    print(f"Entity resolution: {len(leads)} leads merged into {len(resolved)}")
+    return resolved
+
+  @listen(resolve_leads)
+  @checkpoint(flow_state)
+  def prefilter_leads(self, leads):
+    # Deterministic pre-scoring of the leads without a stored score, obviously unqualified leads never reach the LLM crew.
+    # Leads with a fresh stored score always go on, score_leads reuses their score
+    # Weights learned with lead_prefilter.fit() on past scores are loaded from the JSON file if present
+    stored = lead_score_store.get_fresh([lead["lead_id"] for lead in leads])
+    unscored = [lead for lead in leads if lead["lead_id"] not in stored]
+    lead_prefilter = LeadPrefilter(threshold=0.2, weights_path="lead_prefilter_weights.json")
+    kept, dropped = lead_prefilter.split(unscored)
+    with state_lock(self):
+      self.state["prefiltered_out"] = dropped
+    print(f"Pre-filter: {len(stored)} leads with a stored score, {len(kept)} kept, {len(dropped)} dropped before LLM scoring")
+    dropped_ids = {lead["lead_id"] for lead in dropped}
+    return [lead for lead in leads if lead["lead_id"] not in dropped_ids]
+
+  # Router of the qualified leads to their score tier, fed by score_leads as each score arrives
+  _lead_router = None
+
+  def make_lead_router(self):
+    # The three sinks work in parallel, each with its own batch size, flush interval and queue bound (backpressure)
+    lead_router = MicroBatchRouter(route=lead_tier)
+    lead_router.add_destination('salesforce', self.store_in_salesforce, batch_size=200, flush_interval=2.0, max_queue=1000)
+    lead_router.add_destination('sales_team', self.send_to_sales_team, batch_size=25, flush_interval=1.0, max_queue=200)
+    # Larger email batches share more templates per cluster, the bound keeps the slow crew from piling up leads
+    lead_router.add_destination('email', self.write_email, batch_size=50, flush_interval=5.0, max_queue=200)
+    return lead_router
+
+  def qualified(self, new_scores):
+    # Leads of this run with score > 70: the reused scores with an indexed query on the store,
+    # the new ones from score_leads, since store_leads_score may still be writing them
+    qualified = {
+      lead_id: as_scoring_result(result)
+      for lead_id, result in lead_score_store.query(batch_id=self.state["batch_id"], min_score=QUALIFIED_SCORE + 1)
+    }
+    qualified.update((lead_id, score) for lead_id, _, score in new_scores if score.lead_score.score > QUALIFIED_SCORE)
+    return qualified
+
+  @listen(prefilter_leads)
+  @checkpoint(flow_state)
   def score_leads(self, leads):
-    # Run lead_scoring_crew for each lead in leads, then save the results in self.state
-    # leads[0] will return scores[0] and so on
-    scores = lead_scoring_crew.kickoff_for_each(leads)
-    self.state["score_crews_results"] = scores
-    print(scores)
-    return scores
-
+    # Known leads reuse their stored score, only the new ones are scored by lead_scoring_crew
+    # Every lead of this run is added to the run's batch in the store, filters and counts are queries on it
+    with state_lock(self):
+      batch_id = self.state.setdefault("batch_id", uuid.uuid4().hex)
+    stored = lead_score_store.get_fresh([lead["lead_id"] for lead in leads])
+    lead_score_store.add_to_batch(batch_id, stored)
+    new_leads = [lead for lead in leads if lead["lead_id"] not in stored]
+    # Qualified leads are streamed to the router as soon as their score is known, so the sinks
+    # flush their first micro-batches while the rest of the batch is still being scored
+    self._lead_router = self.make_lead_router().start()
+    for lead in self.qualified([]).values():
+      self._lead_router.submit(lead)
+    new_scores = []
+    for lead in new_leads:
+      # One lead at a time, like kickoff_for_each, which only returns once every lead is scored
+      score = as_scoring_result(lead_scoring_crew.copy().kickoff(inputs={"lead_data": lead["lead_data"]}))
+      new_scores.append((lead["lead_id"], lead["lead_data"], score))
+      if score.lead_score.score > QUALIFIED_SCORE:
+        self._lead_router.submit(score)
+    print(f"Lead scoring: {len(stored)} stored scores reused, {len(new_leads)} leads scored")
+    return new_scores
+
+  # store_leads_score, filter_leads and dispatch_leads all listen to score_leads and run concurrently on the worker pool
   @listen(score_leads)
-  def store_leads_score(self, scores):
-    # This is a mock, in a real-world scenario, we would store the scores in the database
-    return scores
+  @concurrent_step
+  @checkpoint(flow_state)
+  def store_leads_score(self, new_scores):
+    # Bulk upsert of the new scores in the SQLite store, reused by the next runs within the freshness window
+    stored = lead_score_store.upsert_many(new_scores, batch_id=self.state["batch_id"])
+    return stored
 
   @listen(score_leads)
-  def filter_leads(self, scores):
-    # Filters for leads with score > 70
-    return [score for score in scores if score['lead_score'].score > 70]
+  @concurrent_step
+  @checkpoint(flow_state)
+  def filter_leads(self, new_scores):
+    return list(self.qualified(new_scores).values())
 
   @listen(and_(filter_leads, store_leads_score))
   def log_leads(self, leads):
     # Logs leads only after both filtering and storing are done
     print(f"Leads: {leads}")
 
-  # This router decorator in the tutorial may be deprecated and no longer accept keyword argument
-  # Might need to re-wrote later
-  @router(filter_leads)
-  def count_leads(self, scores):
-    # Routes leads based on how many were filtered
-    if len(scores) > 10:
-      return 'high'
-    elif len(scores) > 5:
-      return 'medium'
-    else:
-      return 'low'
-
-  @listen('high')
+  @listen(score_leads)
+  @concurrent_step
+  @checkpoint(flow_state)
+  def dispatch_leads(self, new_scores):
+    # Waits for the sinks to flush the leads streamed by score_leads
+    lead_router = self._lead_router
+    if lead_router is None:
+      # score_leads was restored from a checkpoint and streamed nothing in this process
+      lead_router = self.make_lead_router().start()
+      for lead in self.qualified(new_scores).values():
+        lead_router.submit(lead)
+    lead_router.close()
+    self._lead_router = None
+    print(f"Dispatch: {lead_router.stats}")
+    # Written under the state lock: the checkpoints of the sibling steps snapshot the state concurrently
+    with state_lock(self):
+      self.state["dispatch_errors"] = list(lead_router.errors)
+    return lead_router.results
+
   def store_in_salesforce(self, leads):
-    # If score is high, store in salesforce (this is a mock)
+    # Score 90 and above: bulk push to salesforce (this is a mock)
     return leads
 
-  @listen('medium')
   def send_to_sales_team(self, leads):
-    # If score is medium, send to sales team (this is a mock)
+    # Score 80 to 89: hand over to the sales team (this is a mock)
     return leads
 
-  @listen('low')
   def write_email(self, leads):
-    # If few leads: converts results to dicts, then uses email_writing_crew to write emails for each lead in leads
-    scored_leads = [lead.to_dict() for lead in leads]
-    emails = email_writing_crew.kickoff_for_each(scored_leads)
+    # Other qualified leads, in batches: one template per cluster of similar leads, then a light personalization per lead
+    # email_writing_crew.kickoff_for_each([lead.model_dump() for lead in leads]) remains available for fully custom emails
+    # Emails are saved per lead as each batch completes: after a crash, only the leads without an email are written again
+    keys = [idempotency_key(run_id_of(self), "write_email", lead) for lead in leads]
+    emails = once_each(flow_state, keys, leads, email_batcher.write)
+    print(f"Emails: {email_batcher.stats}")
     return emails
 
-  @listen(write_email)
-  def send_email(self, emails):
+  @listen(dispatch_leads)
+  def send_email(self, results):
     # This is a mock code for sending email
-    return emails
+    # Each email is sent at most once per run, even if the flow is restarted in the middle of the batch
+    sent = []
+    for email in results["email"]:
+      key = idempotency_key(run_id_of(self), "send_email", email)
+      sent.append(once(flow_state, key, lambda email=email: email))
+    return sent
   
 # Run the Flow  
 flow = SalesPipeline()
+# To resume a run after a crash, kick it off again with the same run_id:
+# flow.kickoff(inputs={"run_id": "leads-batch-1"})
 
 # Optional: you can plot the flow to visualize it
 flow.plot()
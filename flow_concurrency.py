@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio, contextvars, functools, inspect, threading
+
+# Shared by the flows of the process, so the number of threads doing step I/O stays bounded
+MAX_WORKERS = 8
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="flow-step")
+    return _pool
+
+
+def concurrent_step(method):
+    """
+    Decorator for sync flow steps, placed under @listen/@router (and above @checkpoint).
+    crewAI runs the listeners triggered by the same method with asyncio.gather, but a sync step
+    blocks the event loop, so siblings run one after the other. The decorated step becomes a
+    coroutine that runs the method on the shared worker pool: sibling branches doing I/O (database
+    writes, CRM pushes...) overlap, and an and_() join waits for the slowest instead of the sum.
+    Context variables, e.g. the usage tags of usage_metrics, are copied to the worker thread.
+    """
+    if inspect.iscoroutinefunction(method):
+        return method
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, method, self, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(get_worker_pool(), call)
+    return wrapper
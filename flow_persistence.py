@@ -0,0 +1,262 @@
+import functools, hashlib, importlib, inspect, json, os, sqlite3, sys, threading, time, weakref
+
+
+# Step results and states are stored as JSON. Pydantic models and tuples are tagged so they
+# come back with their type, other objects (e.g. crew outputs) are stored as their dict or text
+def encode(value):
+    if hasattr(value, "model_dump") and hasattr(type(value), "model_validate"):
+        model = type(value)
+        return {"__model__": f"{model.__module__}:{model.__qualname__}", "data": value.model_dump(mode="json")}
+    if isinstance(value, tuple):
+        return {"__tuple__": [encode(item) for item in value]}
+    if isinstance(value, list):
+        return [encode(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): encode(item) for key, item in value.items()}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if hasattr(value, "to_dict"):
+        return encode(value.to_dict())
+    return str(value)
+
+
+def decode(value):
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "__model__" in value:
+        module_name, _, qualname = value["__model__"].partition(":")
+        module = sys.modules.get(module_name) or importlib.import_module(module_name)
+        model = functools.reduce(getattr, qualname.split("."), module)
+        return model.model_validate(value["data"])
+    if "__tuple__" in value:
+        return tuple(decode(item) for item in value["__tuple__"])
+    return {key: decode(item) for key, item in value.items()}
+
+
+class SQLiteFlowState:
+    """
+    Flow state backend in SQLite: the result of every completed step and a snapshot of the
+    flow state after it, per run, plus the results of idempotent side effects.
+    """
+
+    def __init__(self, path="flow_state.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS flow_steps (run_id TEXT NOT NULL, step TEXT NOT NULL, "
+                "result TEXT, state TEXT, completed_at REAL NOT NULL, PRIMARY KEY (run_id, step))"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS side_effects (key TEXT PRIMARY KEY, result TEXT, done_at REAL NOT NULL)"
+            )
+
+    def load_step(self, run_id, step):
+        # Returns (completed, result, state)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT result, state FROM flow_steps WHERE run_id = ? AND step = ?", (run_id, step)
+            ).fetchone()
+        if row is None:
+            return False, None, None
+        return True, json.loads(row[0]), json.loads(row[1])
+
+    def save_step(self, run_id, step, result, state):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO flow_steps VALUES (?, ?, ?, ?, ?)",
+                (run_id, step, json.dumps(result), json.dumps(state), time.time()),
+            )
+
+    def load_effect(self, key):
+        with self._lock:
+            row = self._connection.execute("SELECT result FROM side_effects WHERE key = ?", (key,)).fetchone()
+        return (False, None) if row is None else (True, json.loads(row[0]))
+
+    def save_effect(self, key, result):
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO side_effects VALUES (?, ?, ?)", (key, json.dumps(result), time.time()))
+
+    def completed_steps(self, run_id):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT step FROM flow_steps WHERE run_id = ? ORDER BY completed_at", (run_id,)
+            ).fetchall()
+        return [step for (step,) in rows]
+
+
+class JSONLFlowState:
+    """
+    Append-only log backend: one JSON line per completed step or side effect, flushed and
+    fsynced before the step returns. The log is replayed on start, the last record wins.
+    """
+
+    def __init__(self, path="flow_state.jsonl"):
+        self.path = path
+        self._lock = threading.Lock()
+        self.steps = {}
+        self.effects = {}
+        if os.path.exists(path):
+            with open(path, "r") as file:
+                for line in file:
+                    try:
+                        self._apply(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A crash during the last write leaves a partial line, the step is simply run again
+                        continue
+
+    def _apply(self, record):
+        if record["type"] == "step":
+            self.steps[(record["run_id"], record["step"])] = record
+        else:
+            self.effects[record["key"]] = record
+
+    def _append(self, record):
+        with self._lock:
+            with open(self.path, "a") as file:
+                file.write(json.dumps(record) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            self._apply(record)
+
+    def load_step(self, run_id, step):
+        record = self.steps.get((run_id, step))
+        if record is None:
+            return False, None, None
+        return True, record["result"], record["state"]
+
+    def save_step(self, run_id, step, result, state):
+        self._append({"type": "step", "run_id": run_id, "step": step, "result": result, "state": state, "at": time.time()})
+
+    def load_effect(self, key):
+        record = self.effects.get(key)
+        return (False, None) if record is None else (True, record["result"])
+
+    def save_effect(self, key, result):
+        self._append({"type": "effect", "key": key, "result": result, "at": time.time()})
+
+    def completed_steps(self, run_id):
+        records = sorted((record for (run, _), record in self.steps.items() if run == run_id), key=lambda record: record["at"])
+        return [record["step"] for record in records]
+
+
+def run_id_of(flow):
+    # Pass the same run_id to kickoff(inputs={"run_id": ...}) to resume a run, otherwise each flow instance is a new run
+    state = flow.state
+    get = state.get if isinstance(state, dict) else lambda key: getattr(state, key, None)
+    return get("run_id") or get("id")
+
+
+_state_locks = weakref.WeakKeyDictionary()
+_state_locks_guard = threading.Lock()
+
+
+def state_lock(flow):
+    """
+    Lock of the flow state. Steps that run concurrently (see flow_concurrency) write the state
+    under it, and checkpoints take their snapshot under it, so a snapshot never reads a state
+    being changed by a sibling step.
+    """
+    with _state_locks_guard:
+        return _state_locks.setdefault(flow, threading.RLock())
+
+
+def _snapshot(flow):
+    with state_lock(flow):
+        state = flow.state
+        return encode(state.model_dump() if hasattr(state, "model_dump") else dict(state))
+
+
+def _restore(flow, snapshot):
+    # The state id is the one of the new flow instance, everything else comes back from the snapshot
+    with state_lock(flow):
+        for key, value in decode(snapshot).items():
+            if key == "id":
+                continue
+            if isinstance(flow.state, dict):
+                flow.state[key] = value
+            else:
+                setattr(flow.state, key, value)
+
+
+def checkpoint(backend):
+    """
+    Decorator for flow steps, placed under @start/@listen/@router. After the step completes,
+    its result and a snapshot of the flow state are saved for the run. When the run is
+    restarted, completed steps are not executed again: their state is restored and their
+    saved result is returned, so the flow resumes after the last completed step.
+    Works with sync and async steps.
+    """
+    def decorator(method):
+        step = method.__name__
+
+        def replay(flow):
+            completed, result, state = backend.load_step(run_id_of(flow), step)
+            if completed:
+                _restore(flow, state)
+                print(f"Checkpoint: '{step}' already completed in run {run_id_of(flow)}, result restored")
+            return completed, decode(result) if completed else None
+
+        def save(flow, result):
+            backend.save_step(run_id_of(flow), step, encode(result), _snapshot(flow))
+
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                completed, result = replay(self)
+                if not completed:
+                    result = await method(self, *args, **kwargs)
+                    save(self, result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            completed, result = replay(self)
+            if not completed:
+                result = method(self, *args, **kwargs)
+                save(self, result)
+            return result
+        return wrapper
+    return decorator
+
+
+def idempotency_key(*parts):
+    return hashlib.sha256(json.dumps(encode(list(parts)), sort_keys=True).encode()).hexdigest()
+
+
+def once(backend, key, action):
+    """
+    Runs a side effect (sending an email, creating a CRM record...) at most once per key,
+    across restarts. The saved result is returned when the key was already done.
+    """
+    done, result = backend.load_effect(key)
+    if done:
+        return decode(result)
+    result = action()
+    backend.save_effect(key, encode(result))
+    return result
+
+
+def once_each(backend, keys, items, action):
+    """
+    Batch version of once(): action(items) returns one result per item, and is only called with
+    the items whose key is not done yet. Each result is saved as soon as the batch returns, so a
+    restart after a few batches only redoes the items of the batches that didn't complete.
+    """
+    done = [backend.load_effect(key) for key in keys]
+    missing = [item for item, (is_done, _) in zip(items, done) if not is_done]
+    fresh = iter(action(missing) if missing else [])
+    results = []
+    for key, (is_done, result) in zip(keys, done):
+        if is_done:
+            results.append(decode(result))
+        else:
+            result = next(fresh)
+            backend.save_effect(key, encode(result))
+            results.append(result)
+    return results
@@ -1,21 +1,115 @@
 # break line every 80 characters if line is longer than 80 characters
 # don't break in the middle of a word
-def pretty_print_result(result):
-  parsed_result = []
-  for line in result.split('\n'):
-      if len(line) > 80:
-          words = line.split(' ')
-          new_line = ''
-          for word in words:
-              if len(new_line) + len(word) + 1 > 80:
-                  parsed_result.append(new_line)
-                  new_line = word
-              else:
-                  if new_line == '':
-                      new_line = word
-                  else:
-                      new_line += ' ' + word
-          parsed_result.append(new_line)
+# lines inside ``` code blocks and markdown table rows are never broken
+def pretty_print_result(result, width=80):
+  return "\n".join(wrap_stream([result], width))
+
+
+# Same as pretty_print_result but for text arriving in chunks (e.g. streamed LLM tokens)
+# yields every wrapped line as soon as it is complete, without keeping the whole text in memory
+def wrap_stream(chunks, width=80):
+  wrapper = LineWrapper(width)
+  for chunk in chunks:
+      yield from wrapper.feed(chunk)
+  yield from wrapper.close()
+
+
+class LineWrapper:
+  # Every character is looked at a constant number of times, so wrapping is linear in the text size
+  # A line is kept as a list of pieces until it is longer than width, then it is wrapped word by word
+  def __init__(self, width=80):
+      self.width = width
+      self.in_code_block = False
+      self._new_line()
+
+  def _new_line(self):
+      self.raw = []           # pieces of the current source line while it fits in width
+      self.raw_length = 0
+      self.mode = 'raw'       # 'raw', 'wrap' once the line is too long, or 'verbatim' for code and tables
+      self.words = []         # words of the output line being filled in 'wrap' mode
+      self.words_length = 0
+      self.partial = []       # pieces of a word that may continue in the next chunk
+
+  def feed(self, chunk):
+      lines = []
+      segments = chunk.split('\n')
+      for index, segment in enumerate(segments):
+          self._add_segment(segment, lines)
+          if index < len(segments) - 1:
+              self._end_line(lines)
+      return lines
+
+  def close(self):
+      # The text after the last newline is a line too, even if empty (like str.split('\n'))
+      lines = []
+      self._end_line(lines)
+      return lines
+
+  def _add_segment(self, segment, lines):
+      if not segment:
+          return
+      if self.mode == 'wrap':
+          self._add_words(segment, lines)
+          return
+      self.raw.append(segment)
+      self.raw_length += len(segment)
+      if self.mode == 'raw' and self.raw_length > self.width:
+          text = ''.join(self.raw)
+          stripped = text.lstrip()
+          if self.in_code_block or stripped.startswith('```') or stripped.startswith('|'):
+              self.mode = 'verbatim'
+          else:
+              self.mode = 'wrap'
+              self.raw = []
+              self._add_words(text, lines)
+
+  def _add_words(self, text, lines):
+      words = text.split(' ')
+      self.partial.append(words[0])
+      if len(words) == 1:
+          return
+      self._add_word(''.join(self.partial), lines)
+      for word in words[1:-1]:
+          self._add_word(word, lines)
+      self.partial = [words[-1]]
+
+  def _add_word(self, word, lines):
+      if self.words_length == 0:
+          # spaces at the start of a wrapped line are dropped
+          self.words = [word]
+          self.words_length = len(word)
+      elif self.words_length + len(word) + 1 > self.width:
+          lines.append(' '.join(self.words))
+          self.words = [word]
+          self.words_length = len(word)
       else:
-          parsed_result.append(line)
-  return "\n".join(parsed_result)
\ No newline at end of file
+          self.words.append(word)
+          self.words_length += len(word) + 1
+
+  def _end_line(self, lines):
+      if self.mode == 'wrap':
+          self._add_word(''.join(self.partial), lines)
+          lines.append(' '.join(self.words))
+      else:
+          line = ''.join(self.raw)
+          if line.lstrip().startswith('```'):
+              self.in_code_block = not self.in_code_block
+          lines.append(line)
+      self._new_line()
+
+
+# Prints streamed text as it arrives, long lines are printed as soon as each wrapped part is complete
+class StreamPrinter:
+  def __init__(self, write=None, width=80):
+      self.write = write or (lambda text: print(text, end='', flush=True))
+      self.wrapper = LineWrapper(width)
+
+  def feed(self, chunk):
+      for line in self.wrapper.feed(chunk):
+          self.write(line + '\n')
+
+  def flush(self):
+      lines = self.wrapper.close()
+      # close() returns the unfinished last line, which is empty if the text ended with a newline
+      if lines and lines != ['']:
+          self.write('\n'.join(lines) + '\n')
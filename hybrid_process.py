@@ -0,0 +1,201 @@
+from crewai import Crew, Process
+from structured_output import rebuild_task
+import json, re
+
+# Outputs that look like the agent gave up or ran out of iterations, the manager reviews those
+LOW_CONFIDENCE_PATTERNS = [
+    r"agent stopped due to iteration limit",
+    r"\bI (?:do not|don't) (?:know|have (?:enough|access))",
+    r"\bI (?:cannot|can't|am unable to|was unable to)\b",
+    r"\bunable to (?:find|access|retrieve|complete)\b",
+    r"\bno (?:data|information) (?:is |was )?(?:available|found)\b",
+]
+
+
+def is_low_confidence(text, min_length=200):
+    # Cheap local check, no LLM call. Very short answers are usually a failed tool loop
+    text = (text or "").strip()
+    if len(text) < min_length:
+        return True
+    return any(re.search(pattern, text, re.IGNORECASE) for pattern in LOW_CONFIDENCE_PATTERNS)
+
+
+def _extract_json(text):
+    # The manager may wrap its JSON in ```json fences or add a sentence around it
+    match = re.search(r"\{.*\}|\[.*\]", text or "", re.DOTALL)
+    return json.loads(match.group(0)) if match else None
+
+
+class HybridCrew:
+    """
+    A cheaper alternative to Process.hierarchical.
+    The manager LLM is called once to plan which agent runs which task and which earlier
+    outputs it needs, then the tasks run sequentially with that fixed plan. The manager is
+    only called again to review an output that fails the local confidence check or the task's
+    own guardrail, instead of before and after every delegation.
+    """
+
+    def __init__(self, agents, tasks, manager_llm, plan_with_manager=True,
+                 confidence_check=is_low_confidence, max_reviews=1, verbose=True):
+        self.agents = agents
+        self.tasks = tasks
+        self.manager_llm = manager_llm
+        self.plan_with_manager = plan_with_manager
+        self.confidence_check = confidence_check
+        self.max_reviews = max_reviews
+        self.verbose = verbose
+        self.manager_calls = 0
+        self.plan = None
+
+    def derive_plan(self):
+        """
+        Deterministic plan from the task definitions, no LLM call.
+        A task keeps its own agent and context when they are set. Otherwise it depends on the
+        earlier tasks whose agent is mentioned in its description ("insights from the Data
+        Analyst Agent"), or on the previous task if no agent is mentioned.
+        """
+        plan = []
+        for index, task in enumerate(self.tasks):
+            agent = task.agent or self.agents[index % len(self.agents)]
+            if isinstance(task.context, list):
+                context = [self.tasks.index(upstream) for upstream in task.context]
+            else:
+                description = task.description.lower()
+                context = [
+                    upstream_index for upstream_index, upstream in enumerate(self.tasks[:index])
+                    if upstream.agent and _mentions_role(description, upstream.agent.role)
+                ]
+                if not context and index > 0:
+                    context = [index - 1]
+            plan.append({"task": index, "agent": agent.role.strip(), "context": context})
+        return plan
+
+    def plan_once(self):
+        # A single manager call that may improve the derived plan, falls back to it on a bad answer
+        derived = self.derive_plan()
+        if not self.plan_with_manager:
+            return derived
+
+        agents = "\n".join(f"- {agent.role.strip()}: {agent.goal.strip()}" for agent in self.agents)
+        tasks = "\n".join(f"{index}. {' '.join(task.description.split())}" for index, task in enumerate(self.tasks))
+        self.manager_calls += 1
+        answer = self.manager_llm.call([
+            {"role": "system", "content": "You are a crew manager. You plan the whole project upfront "
+                                          "so the team can work without further coordination."},
+            {"role": "user", "content": (
+                f"Agents:\n{agents}\n\nTasks, executed in this order:\n{tasks}\n\n"
+                "Assign every task to the best agent and list which earlier task numbers it needs as context.\n"
+                f"Start from this draft plan and only change what is wrong:\n{json.dumps(derived)}\n\n"
+                "Answer only with a JSON list of objects with the keys task, agent and context."
+            )},
+        ])
+        try:
+            planned = _extract_json(answer)
+            return self._validate_plan(planned) or derived
+        except (ValueError, TypeError, KeyError):
+            return derived
+
+    def _validate_plan(self, planned):
+        roles = {agent.role.strip(): agent for agent in self.agents}
+        if not isinstance(planned, list) or len(planned) != len(self.tasks):
+            return None
+        plan = []
+        for index, step in enumerate(sorted(planned, key=lambda step: int(step["task"]))):
+            if int(step["task"]) != index or step["agent"].strip() not in roles:
+                return None
+            # Context can only point backwards since the plan runs sequentially
+            context = sorted({int(upstream) for upstream in step.get("context", []) if 0 <= int(upstream) < index})
+            plan.append({"task": index, "agent": step["agent"].strip(), "context": context})
+        return plan
+
+    def _review_guardrail(self, task, agent, previous_guardrail):
+        # agent is the one the plan assigned, task.agent may be unset or a different agent
+        previous_guardrail = _callable_guardrail(previous_guardrail, agent)
+        reviews = {"count": 0}
+
+        def guardrail(task_output):
+            result, problem = task_output, None
+            if previous_guardrail is not None:
+                try:
+                    success, result = previous_guardrail(task_output)
+                except Exception as error:
+                    success, result = False, f"The output could not be validated: {error}"
+                if not success:
+                    problem = result
+            if problem is None and not self.confidence_check(task_output.raw):
+                return True, result
+            if reviews["count"] >= self.max_reviews:
+                return (False, problem) if problem is not None else (True, result)
+
+            # Only now do we pay for a manager round trip: a failed validation or a low-confidence output
+            reviews["count"] += 1
+            self.manager_calls += 1
+            failure = f"It was rejected by the validation: {problem}\n\n" if problem is not None else ""
+            verdict = self.manager_llm.call([
+                {"role": "system", "content": "You are a crew manager reviewing the work of your team."},
+                {"role": "user", "content": (
+                    f"Task: {' '.join(task.description.split())}\n"
+                    f"Expected output: {' '.join(task.expected_output.split())}\n\n"
+                    f"Output of the {agent.role.strip()}:\n{task_output.raw}\n\n{failure}"
+                    "If the output is acceptable answer APPROVE. Otherwise answer REVISE "
+                    "followed by precise instructions to fix it."
+                )},
+            ])
+            verdict = verdict.strip()
+            # The manager can't approve an output the validation rejected
+            if verdict.upper().startswith("APPROVE"):
+                return (False, problem) if problem is not None else (True, result)
+            # The feedback is given to the same agent, which retries the task
+            if verdict.upper().startswith("REVISE"):
+                verdict = verdict[len("REVISE"):].strip(" :\n")
+            return False, verdict or problem or "The manager rejected this output, try again."
+
+        return guardrail
+
+    def build_crew(self):
+        self.plan = self.plan_once()
+        roles = {agent.role.strip(): agent for agent in self.agents}
+        # The tasks are rebuilt with the review guardrail, assigning it to the built task could be ignored by crewAI
+        tasks = list(self.tasks)
+        for step in self.plan:
+            task, agent = tasks[step["task"]], roles[step["agent"]]
+            # A task's own copy of the planned agent is kept, e.g. the one with_structured_output gives it
+            if task.agent is not None and task.agent.role.strip() == step["agent"]:
+                agent = task.agent
+            tasks[step["task"]] = rebuild_task(
+                task,
+                agent=agent,
+                guardrail=self._review_guardrail(task, agent, task.guardrail),
+                max_retries=max(getattr(task, "max_retries", 0) or 0, self.max_reviews),
+            )
+        for step in self.plan:
+            tasks[step["task"]].context = [tasks[upstream] for upstream in step["context"]]
+        self.tasks = tasks
+        return Crew(
+            agents=self.agents,
+            tasks=self.tasks,
+            process=Process.sequential,
+            verbose=self.verbose,
+        )
+
+    def kickoff(self, inputs=None):
+        return self.build_crew().kickoff(inputs=inputs)
+
+
+def _callable_guardrail(guardrail, agent):
+    # A string guardrail is a description checked by an LLM, as crewAI does, with the assigned agent's LLM
+    if guardrail is None or callable(guardrail):
+        return guardrail
+    if isinstance(guardrail, str):
+        from crewai.tasks.llm_guardrail import LLMGuardrail
+        return LLMGuardrail(description=guardrail, llm=agent.llm)
+    raise TypeError(f"A task guardrail must be a callable or a string, not {type(guardrail).__name__}")
+
+
+def _mentions_role(description, role):
+    # "Trading Strategy Developer" is often referred to as the "Trading Strategy Agent"
+    words = role.lower().split()
+    candidates = {" ".join(words)}
+    if len(words) >= 3:
+        candidates.add(" ".join(words[:-1]))
+    return any(candidate in description for candidate in candidates)
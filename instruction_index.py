@@ -0,0 +1,184 @@
+from crewai.tools import BaseTool
+from collections import Counter
+from pydantic import BaseModel, Field
+from typing import Any, Type
+import json, math, os, re, threading, time
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it", "its",
+    "of", "on", "or", "our", "that", "the", "their", "them", "they", "this", "to", "with", "you", "your",
+}
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+
+def tokenize(text):
+    tokens = []
+    for token in re.findall(r"[a-z0-9]+", text.lower()):
+        if token in STOPWORDS:
+            continue
+        # Light stemming, enough for "startups" to match "startup"
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def split_sections(text):
+    """
+    Splits a markdown playbook into (heading, body) sections at `#` and `##` headings.
+    Deeper headings stay inside their section. The document title is returned separately,
+    since it describes every section of the file (e.g. the industry of the playbook).
+    """
+    title = ""
+    sections = []
+    heading, lines = "", []
+    for line in text.splitlines():
+        match = re.match(r"(#{1,2})\s+(.*)", line)
+        if match:
+            if lines and "".join(lines).strip():
+                sections.append((heading, "\n".join(lines).strip()))
+            if len(match.group(1)) == 1 and not title:
+                title = match.group(2).strip()
+            heading, lines = match.group(2).strip(), []
+        else:
+            lines.append(line)
+    if lines and "".join(lines).strip():
+        sections.append((heading, "\n".join(lines).strip()))
+    return title, sections
+
+
+class InstructionIndex:
+    """
+    BM25 index over the sections of the markdown files of an instructions directory.
+    The index is saved to a JSON file with the modification time and size of every file,
+    and only the files that changed since are parsed again, so a library of hundreds of
+    playbooks is not re-read on every run.
+    Searches look for changed files (a walk and a stat of the directory) at most once every
+    refresh_interval seconds, or on the next search after invalidate().
+    """
+
+    def __init__(self, directory="./instructions", index_path="instruction_index.json", refresh_interval=60.0):
+        self.directory = directory
+        self.index_path = index_path
+        self.files = {}  # relative path -> {"signature": [mtime_ns, size], "sections": [...]}
+        self.postings = {}
+        self.sections = []
+        self.average_length = 0.0
+        self.refresh_interval = refresh_interval
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+        if index_path and os.path.exists(index_path):
+            with open(index_path, "r") as file:
+                saved = json.load(file)
+            if saved.get("directory") == os.path.abspath(directory):
+                self.files = saved["files"]
+        self.refresh()
+
+    def _scan(self):
+        signatures = {}
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".md"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    signatures[os.path.relpath(path, self.directory)] = [stat.st_mtime_ns, stat.st_size]
+        return signatures
+
+    def _parse(self, relative_path):
+        with open(os.path.join(self.directory, relative_path), "r", encoding="utf-8") as file:
+            title, sections = split_sections(file.read())
+        return [
+            {
+                "title": title,
+                "heading": heading,
+                "text": body,
+                # The file name and title are indexed with every section of the file
+                "terms": Counter(tokenize(f"{relative_path} {title} {heading} {body}")),
+            }
+            for heading, body in sections
+        ]
+
+    def refresh(self):
+        """Re-parses the files added or changed since the last build. Returns True if the index changed."""
+        with self._lock:
+            signatures = self._scan()
+            self._refreshed_at = time.monotonic()
+            changed = {path for path, signature in signatures.items() if self.files.get(path, {}).get("signature") != signature}
+            removed = set(self.files) - set(signatures)
+            if not changed and not removed and self.sections:
+                return False
+            for path in removed:
+                del self.files[path]
+            for path in changed:
+                self.files[path] = {"signature": signatures[path], "sections": self._parse(path)}
+            self._build_postings()
+            if changed or removed:
+                self._save()
+            return bool(changed or removed)
+
+    def _build_postings(self):
+        self.sections, self.postings = [], {}
+        for path in sorted(self.files):
+            for position, section in enumerate(self.files[path]["sections"]):
+                index = len(self.sections)
+                length = sum(section["terms"].values())
+                self.sections.append({**section, "file": path, "position": position, "length": length})
+                for term, count in section["terms"].items():
+                    self.postings.setdefault(term, []).append((index, count))
+        self.average_length = sum(section["length"] for section in self.sections) / max(len(self.sections), 1)
+
+    def _save(self):
+        if not self.index_path:
+            return
+        temporary_path = f"{self.index_path}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump({"directory": os.path.abspath(self.directory), "files": self.files}, file)
+        os.replace(temporary_path, self.index_path)
+
+    def invalidate(self):
+        # The next search checks the directory, e.g. after writing a new playbook
+        self._refreshed_at = None
+
+    def search(self, query, top_k=4):
+        refreshed_at = self._refreshed_at
+        if refreshed_at is None or time.monotonic() - refreshed_at >= self.refresh_interval:
+            self.refresh()
+        scores = Counter()
+        total = len(self.sections)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term, [])
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for index, count in postings:
+                length = self.sections[index]["length"]
+                scores[index] += idf * count * (K1 + 1) / (count + K1 * (1 - B + B * length / self.average_length))
+        return [(self.sections[index], score) for index, score in scores.most_common(top_k)]
+
+
+class InstructionSearchInput(BaseModel):
+    query: str = Field(..., description="What to look for, e.g. the lead's industry and the kind of outreach.")
+    top_k: int = Field(4, description="Number of sections to return.")
+
+
+class InstructionSearchTool(BaseTool):
+    name: str = "Search Instructions"
+    description: str = (
+        "Searches the library of outreach instructions and returns the most relevant sections "
+        "(guidelines, key points, template messages) for a query such as the lead's industry, in one call."
+    )
+    args_schema: Type[BaseModel] = InstructionSearchInput
+    index: Any = Field(default=None, exclude=True)
+
+    def _run(self, query: str, top_k: int = 4) -> str:
+        results = self.index.search(query, top_k=top_k)
+        if not results:
+            return f"No instructions found for '{query}'."
+        # Sections of the same playbook are returned together and in their original order
+        results.sort(key=lambda result: (result[0]["file"], result[0]["position"]))
+        return "\n\n".join(
+            f"### {section['title']} - {section['heading']} ({section['file']})\n{section['text']}"
+            for section, _ in results
+        )
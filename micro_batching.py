@@ -0,0 +1,122 @@
+import queue, threading, time
+
+_CLOSE = object()
+
+
+class Destination:
+    def __init__(self, name, sink, batch_size, flush_interval, max_queue):
+        self.name = name
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Bounded queue: submit() blocks when the destination falls behind (backpressure)
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.results = []
+        self.errors = []
+        self.stats = {"items": 0, "batches": 0, "failed_items": 0, "sink_seconds": 0.0}
+        self.thread = None
+
+
+class MicroBatchRouter:
+    """
+    Streams items to per-destination queues instead of routing a whole batch at once.
+    Each destination has its own worker thread, which calls its sink with lists of items as soon
+    as batch_size items are waiting or flush_interval seconds passed since the first one.
+    The destinations work in parallel at their own batch size, so a slow or large destination
+    never holds back the others. Use it as a context manager, leaving it flushes and stops the workers.
+    """
+
+    def __init__(self, route):
+        # route(item) returns the name of the destination of the item
+        self.route = route
+        self.destinations = {}
+        self._started = False
+
+    def add_destination(self, name, sink, batch_size=10, flush_interval=1.0, max_queue=100):
+        self.destinations[name] = Destination(name, sink, batch_size, flush_interval, max_queue)
+        return self
+
+    def start(self):
+        for destination in self.destinations.values():
+            destination.thread = threading.Thread(
+                target=self._work, args=(destination,), name=f"micro-batch-{destination.name}", daemon=True
+            )
+            destination.thread.start()
+        self._started = True
+        return self
+
+    def submit(self, item, timeout=None):
+        if not self._started:
+            self.start()
+        name = self.route(item)
+        if name not in self.destinations:
+            raise ValueError(f"No destination '{name}' for {item!r}")
+        self.destinations[name].queue.put(item, timeout=timeout)
+        return name
+
+    def close(self):
+        # Flushes what is left in every queue and waits for the workers
+        for destination in self.destinations.values():
+            if destination.thread is not None:
+                destination.queue.put(_CLOSE)
+        for destination in self.destinations.values():
+            if destination.thread is not None:
+                destination.thread.join()
+        self._started = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _work(self, destination):
+        closing = False
+        while not closing:
+            item = destination.queue.get()
+            if item is _CLOSE:
+                break
+            batch = [item]
+            deadline = time.monotonic() + destination.flush_interval
+            while len(batch) < destination.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = destination.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _CLOSE:
+                    closing = True
+                    break
+                batch.append(item)
+            self._flush(destination, batch)
+
+    def _flush(self, destination, batch):
+        start = time.perf_counter()
+        try:
+            result = destination.sink(batch)
+        except Exception as error:
+            # A failing batch is kept with its error, the destination goes on with the next one
+            destination.errors.append({"error": str(error), "items": batch})
+            destination.stats["failed_items"] += len(batch)
+        else:
+            if isinstance(result, list):
+                destination.results.extend(result)
+            elif result is not None:
+                destination.results.append(result)
+        destination.stats["items"] += len(batch)
+        destination.stats["batches"] += 1
+        destination.stats["sink_seconds"] += time.perf_counter() - start
+
+    @property
+    def results(self):
+        return {name: destination.results for name, destination in self.destinations.items()}
+
+    @property
+    def errors(self):
+        return {name: destination.errors for name, destination in self.destinations.items() if destination.errors}
+
+    @property
+    def stats(self):
+        return {name: dict(destination.stats) for name, destination in self.destinations.items()}
@@ -0,0 +1,186 @@
+from crewai import LLM
+from collections import defaultdict
+import atexit, json, os, re, threading, time
+
+# Words in the agent's prompt that hint at the kind of work, used when no success rate is known yet
+HEAVY_TASK_WORDS = ("strateg", "analy", "write", "writing", "article", "report", "review", "quality",
+                    "assess", "evaluate", "plan", "validat", "optimi")
+LIGHT_TASK_WORDS = ("search", "collect", "monitor", "fetch", "extract", "gather", "scrape", "list", "classif")
+
+
+def _content(message):
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        # Multi-part messages: [{"type": "text", "text": ...}, ...]
+        content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+def estimate_tokens(messages):
+    # ~4 characters per token is close enough for routing decisions
+    return sum(len(_content(message)) for message in messages) // 4
+
+
+def expects_json(messages):
+    # crewAI's output converter and output_json/output_pydantic tasks ask for a JSON answer
+    last = _content(messages[-1]).lower() if messages else ""
+    return "json" in last and ("format" in last or "schema" in last)
+
+
+def parses(response):
+    """
+    Checks that a structured-output response contains valid JSON.
+    ReAct format errors are not checked: crewAI already asks the same model again for those.
+    """
+    match = re.search(r"\{.*\}|\[.*\]", (response or "").strip(), re.DOTALL)
+    if not match:
+        return False
+    try:
+        json.loads(match.group(0))
+    except ValueError:
+        return False
+    return True
+
+
+class RoutedLLM(LLM):
+    """
+    Drop-in replacement for LLM that picks the model per call.
+    Most calls go to the cheap and fast lite model; the full model is used for large prompts,
+    heavy task types, final-answer steps of agents whose lite success rate is too low, and as
+    an escalation when the lite answer to a structured-output call is not valid JSON.
+    """
+
+    def __init__(self, model="gemini/gemini-2.0-flash", lite_model="gemini/gemini-2.0-flash-lite",
+                 max_lite_prompt_tokens=8000, min_success_rate=0.8, min_samples=5,
+                 stats_path="model_router_stats.json", save_interval=30.0, **kwargs):
+        super().__init__(model=model, **kwargs)
+        self.lite_llm = LLM(model=lite_model, **kwargs)
+        self.max_lite_prompt_tokens = max_lite_prompt_tokens
+        self.min_success_rate = min_success_rate
+        self.min_samples = min_samples
+        self.stats_path = stats_path
+        # The learned stats are saved at most every save_interval seconds and at exit, not on every call
+        self.save_interval = save_interval
+        self._saved_at = time.monotonic()
+        self._dirty = False
+        # Learned per agent role: how often the lite model gave valid structured output
+        self.lite_stats = defaultdict(lambda: {"success": 0, "failure": 0})
+        self.routed = {"lite": 0, "full": 0, "escalated": 0}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._load_stats()
+        atexit.register(self.save_stats)
+
+    def _load_stats(self):
+        if self.stats_path and os.path.exists(self.stats_path):
+            try:
+                with open(self.stats_path, "r") as file:
+                    saved = json.load(file)
+            except (OSError, ValueError):
+                # Unreadable stats only cost the learned history, routing starts again from the heuristics
+                return
+            try:
+                for key, value in saved.items():
+                    self.lite_stats[key].update(success=int(value["success"]), failure=int(value["failure"]))
+            except (TypeError, ValueError, KeyError, AttributeError):
+                # Stats of another shape, e.g. written by an older version
+                self.lite_stats.clear()
+
+    def save_stats(self):
+        # Written to a temporary file then renamed, a crash during the write keeps the previous stats
+        if not self.stats_path:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                snapshot = json.dumps(self.lite_stats, indent=2)
+                self._dirty = False
+                self._saved_at = time.monotonic()
+            temporary_path = f"{self.stats_path}.tmp"
+            with open(temporary_path, "w") as file:
+                file.write(snapshot)
+            os.replace(temporary_path, self.stats_path)
+
+    def close(self):
+        self.save_stats()
+
+    def _route_key(self, messages):
+        # crewAI's system prompt starts with "You are {role}."
+        match = re.match(r"\s*You are (.+?)\.", _content(messages[0])) if messages else None
+        return match.group(1).strip() if match else "default"
+
+    def success_rate(self, key):
+        stats = self.lite_stats[key]
+        samples = stats["success"] + stats["failure"]
+        return stats["success"] / samples if samples >= self.min_samples else None
+
+    def choose(self, messages):
+        """Returns "lite" or "full" for these messages."""
+        if estimate_tokens(messages) > self.max_lite_prompt_tokens:
+            return "full"
+
+        # Once an agent has enough history, the learned success rate decides
+        success_rate = self.success_rate(self._route_key(messages))
+        if success_rate is not None:
+            return "lite" if success_rate >= self.min_success_rate else "full"
+
+        system = _content(messages[0]).lower() if messages else ""
+        has_tools = "you only have access to the following tools" in system
+        is_tool_loop = any("Observation:" in _content(message) for message in messages[1:])
+        if has_tools or is_tool_loop:
+            # Steps of a tool-using agent are mostly tool calls, crewAI re-prompts on a badly formatted step
+            return "lite"
+        # Final answer without tools: heavy work goes to the full model
+        heavy = sum(word in system for word in HEAVY_TASK_WORDS)
+        light = sum(word in system for word in LIGHT_TASK_WORDS)
+        return "full" if heavy > light else "lite"
+
+    def call(self, messages, *args, **kwargs):
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+
+        if self.choose(messages) == "full":
+            with self._lock:
+                self.routed["full"] += 1
+            return super().call(messages, *args, **kwargs)
+
+        with self._lock:
+            self.routed["lite"] += 1
+        response = self.lite_llm.call(messages, *args, **kwargs)
+        # Tool calls with native function calling return the tool result, not text.
+        # Only structured-output answers are validated and escalated
+        if not isinstance(response, str) or not expects_json(messages):
+            return response
+
+        ok = parses(response)
+        key = self._route_key(messages)
+        with self._lock:
+            self.lite_stats[key]["success" if ok else "failure"] += 1
+            self._dirty = True
+            save_due = time.monotonic() - self._saved_at >= self.save_interval
+            if not ok:
+                self.routed["escalated"] += 1
+        if save_due:
+            self.save_stats()
+        if ok:
+            return response
+        # Escalate only when the cheap answer is unusable
+        return super().call(messages, *args, **kwargs)
+
+
+# RoutedLLM options that a plain LLM doesn't accept
+ROUTER_OPTIONS = ("lite_model", "max_lite_prompt_tokens", "min_success_rate", "min_samples",
+                  "stats_path", "save_interval")
+
+
+def create_llm(model="gemini/gemini-2.0-flash", routed=None, **kwargs):
+    """
+    LLM factory shared by all the crews: a RoutedLLM, or a plain LLM when routed=False
+    or the MODEL_ROUTING environment variable is "off".
+    """
+    if routed is None:
+        routed = os.getenv("MODEL_ROUTING", "on").lower() not in ("off", "false", "0")
+    if routed:
+        return RoutedLLM(model=model, **kwargs)
+    return LLM(model=model, **{key: value for key, value in kwargs.items() if key not in ROUTER_OPTIONS})
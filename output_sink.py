@@ -0,0 +1,163 @@
+from datetime import datetime
+import gzip, hashlib, json, os, queue, threading, time, uuid
+
+_STOP = object()
+
+
+def _atomic_write(path, data, compress=False):
+    # Written next to the target then renamed, so readers never see a partial file
+    temporary_path = f"{path}.tmp-{uuid.uuid4().hex[:8]}"
+    try:
+        with open(temporary_path, "wb") as file:
+            if compress:
+                with gzip.GzipFile(filename=os.path.basename(path)[:-len(".gz")], mode="wb", fileobj=file) as compressed:
+                    compressed.write(data)
+            else:
+                file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
+class RunOutputSink:
+    """
+    Output files of one crew run, written to their own directory (base_dir/<time>-<run_id>),
+    so concurrent runs never overwrite each other's files.
+    write() only queues the content: a background thread writes each file atomically
+    (temporary file + rename), optionally gzipped, and keeps manifest.json up to date with
+    the path, size and sha256 of every artifact. close() waits for the pending writes, a write()
+    after close(), e.g. from the callback of an async task that finished late, is written synchronously.
+    While a bound task runs, its answer can be streamed to stream_path(task) (<name>.partial, see
+    StreamingOutput); the partial file is removed once the final file is in place.
+    """
+
+    def __init__(self, base_dir="outputs", run_id=None, compress=False):
+        self.run_id = run_id or uuid.uuid4().hex[:8]
+        self.run_dir = os.path.join(base_dir, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{self.run_id}")
+        self.compress = compress
+        self.artifacts = {}
+        self.errors = []
+        # id(task) -> output file name, for the tasks bound with bind_output_files()
+        self.task_files = {}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._closing_lock = threading.Lock()
+        os.makedirs(self.run_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._work, name=f"output-sink-{self.run_id}", daemon=True)
+        self._thread.start()
+
+    def path(self, name):
+        return os.path.join(self.run_dir, name + (".gz" if self.compress else ""))
+
+    def stream_path(self, task):
+        # Where the answer of a bound task is streamed while it is generated, None for other tasks
+        name = self.task_files.get(id(task))
+        return os.path.join(self.run_dir, f"{name}.partial") if name else None
+
+    def write(self, name, content, metadata=None):
+        # Returns immediately, the file is written in the background.
+        # Once closed, there is no background thread anymore: the file is written before returning
+        data = content.encode() if isinstance(content, str) else content
+        with self._closing_lock:
+            if self._closed:
+                self._write(name, data, metadata or {})
+            else:
+                self._queue.put((name, data, metadata or {}))
+        return self.path(name)
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._write(*item)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, name, data, metadata):
+        path = self.path(name)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _atomic_write(path, data, compress=self.compress)
+        except OSError as error:
+            # The run goes on, the failed artifact is reported in errors and in the manifest
+            with self._lock:
+                self.errors.append({"name": name, "error": str(error)})
+                self._write_manifest()
+            return
+        partial_path = os.path.join(self.run_dir, f"{name}.partial")
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        with self._lock:
+            self.artifacts[name] = {
+                "path": os.path.relpath(path, self.run_dir),
+                "bytes": len(data),
+                "sha256": hashlib.sha256(data).hexdigest(),
+                "compressed": self.compress,
+                "written_at": time.time(),
+                **metadata,
+            }
+            self._write_manifest()
+
+    def _write_manifest(self):
+        # Called under self._lock: the worker and late synchronous writes update the manifest one at a time
+        manifest = {"run_id": self.run_id, "artifacts": self.artifacts, "errors": self.errors}
+        _atomic_write(os.path.join(self.run_dir, "manifest.json"), json.dumps(manifest, indent=2).encode())
+
+    def flush(self):
+        # Blocks until every queued file is written
+        self._queue.join()
+
+    def close(self):
+        with self._closing_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(_STOP)
+        self._thread.join()
+        return self.artifacts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _task_output_content(task_output, name):
+    # Same content as crewAI's own output_file: JSON for structured outputs, the raw text otherwise
+    if name.endswith(".json"):
+        if getattr(task_output, "json_dict", None):
+            return json.dumps(task_output.json_dict, indent=2)
+        if getattr(task_output, "pydantic", None) is not None:
+            return task_output.pydantic.model_dump_json(indent=2)
+    return task_output.raw
+
+
+def bind_output_files(crew, sink):
+    """
+    Redirects the output_file of every task of the crew to the sink: crewAI no longer writes it
+    synchronously in the current directory, a task callback queues it in the run directory instead.
+    To keep streaming the answers to files, create StreamingOutput with output_path=sink.stream_path.
+    """
+    for task in crew.tasks:
+        if task.output_file:
+            _bind_task(task, sink, task.output_file)
+    return crew
+
+
+def _bind_task(task, sink, name):
+    callback = task.callback
+    sink.task_files[id(task)] = name
+
+    def write_output(task_output):
+        sink.write(name, _task_output_content(task_output, name), {"task": task.name or task.description[:80]})
+        if callback:
+            callback(task_output)
+
+    task.output_file = None
+    task.callback = write_output
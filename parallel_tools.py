@@ -0,0 +1,59 @@
+from crewai.tools import BaseTool
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Type
+
+
+class ToolCall(BaseModel):
+    tool: str = Field(..., description="Exact name of the tool to run.")
+    arguments: Dict[str, Any] = Field(default_factory=dict, description="Arguments of the tool, as a JSON object.")
+
+
+class ParallelToolCallsInput(BaseModel):
+    calls: List[ToolCall] = Field(..., description="Independent tool calls to run at the same time.")
+
+
+class ParallelToolRunner(BaseTool):
+    """
+    Lets an agent request several independent tool calls in one step, e.g. three searches and
+    two page scrapes. They run concurrently in a thread pool and the results come back in the
+    order of the calls, so the agent needs one LLM round trip instead of one per tool call.
+    """
+    name: str = "Run Tools In Parallel"
+    description: str = ""
+    args_schema: Type[BaseModel] = ParallelToolCallsInput
+    tools: List[Any] = Field(default_factory=list, exclude=True)
+    max_workers: int = 8
+
+    def model_post_init(self, __context):
+        super().model_post_init(__context)
+        names = ", ".join(tool.name for tool in self.tools)
+        self.description = (
+            "Runs several independent tool calls at the same time and returns all their results in order. "
+            f"Use it instead of calling tools one by one when the calls do not depend on each other. Available tools: {names}."
+        )
+
+    def _run_one(self, call):
+        tools = {tool.name.strip().lower(): tool for tool in self.tools}
+        tool = tools.get(call.tool.strip().lower())
+        if tool is None:
+            return f"Error: unknown tool '{call.tool}'."
+        try:
+            return tool.run(**call.arguments)
+        except Exception as error:
+            # One failing call should not lose the results of the others
+            return f"Error: {error}"
+
+    def _run(self, calls: List[Any]) -> str:
+        calls = [call if isinstance(call, ToolCall) else ToolCall(**call) for call in calls]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(len(calls), 1))) as executor:
+            results = list(executor.map(self._run_one, calls))
+        return "\n\n".join(
+            f"### Result {index} - {call.tool}({call.arguments})\n{result}"
+            for index, (call, result) in enumerate(zip(calls, results), start=1)
+        )
+
+
+def with_parallel_tools(tools, max_workers=8):
+    # Keeps the single tools for dependent calls and adds the parallel runner for batches
+    return tools + [ParallelToolRunner(tools=tools, max_workers=max_workers)]
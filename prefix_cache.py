@@ -0,0 +1,106 @@
+from crewai import LLM
+import hashlib, threading
+
+# crewAI puts the task after this marker when the agent does not use a system prompt
+TASK_MARKER = "\nCurrent Task:"
+
+
+def _estimate_tokens(text):
+    return len(text) // 4
+
+
+class PrefixCache:
+    """
+    Registry of the static prompt prefixes of the agents: role, goal, backstory and tool
+    descriptions, which crewAI re-sends on every step of the agent loop.
+    Each prefix is stored once under its hash. `repeated_prefix_tokens` counts the prefix tokens
+    sent again, which is only a measure of the repetition: nothing is saved unless the prefix
+    reaches min_cache_tokens and is sent to Gemini context caching, counted in `cached_prefix_tokens`.
+    """
+
+    def __init__(self, min_cache_tokens=4096):
+        # Gemini only caches prompts above a minimum size, smaller prefixes are only counted
+        self.min_cache_tokens = min_cache_tokens
+        self.prefixes = {}
+        self.stats = {
+            "calls": 0, "prefix_hits": 0, "repeated_prefix_tokens": 0,
+            "sent_to_gemini_cache": 0, "cached_prefix_tokens": 0, "below_cache_threshold": 0,
+        }
+        self._lock = threading.Lock()
+
+    def register(self, prefix):
+        # Returns True when the prefix was already sent by a previous call
+        key = hashlib.sha256(prefix.encode()).hexdigest()
+        with self._lock:
+            self.stats["calls"] += 1
+            hit = key in self.prefixes
+            if hit:
+                self.stats["prefix_hits"] += 1
+                self.stats["repeated_prefix_tokens"] += _estimate_tokens(prefix)
+            else:
+                self.prefixes[key] = prefix
+            if not self.should_use_gemini_cache(prefix):
+                self.stats["below_cache_threshold"] += 1
+        return hit
+
+    def should_use_gemini_cache(self, prefix):
+        return _estimate_tokens(prefix) >= self.min_cache_tokens
+
+
+def split_static_prefix(messages):
+    """
+    Returns (static prefix, index of the message it comes from, dynamic rest of that message).
+    The static prefix is the system message, or the part of the first user message before
+    the task when the agent has use_system_prompt=False.
+    """
+    if not messages or not isinstance(messages[0].get("content"), str):
+        return None, None, None
+    first = messages[0]
+    if first["role"] == "system":
+        return first["content"], 0, ""
+    position = first["content"].find(TASK_MARKER)
+    if position > 0:
+        return first["content"][:position], 0, first["content"][position:]
+    return None, None, None
+
+
+class PrefixCaching:
+    """
+    Mixin for LLM classes: hashes the static prefix of every call and, when it is large enough,
+    marks it with cache_control so litellm stores it with Gemini context caching and later calls
+    only send the dynamic suffix. Use PrefixCachingLLM, or combine it with another LLM class,
+    e.g. `class CachedRoutedLLM(PrefixCaching, RoutedLLM)`.
+    """
+
+    def __init__(self, *args, prefix_cache=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prefix_cache = prefix_cache or PrefixCache()
+
+    def call(self, messages, *args, **kwargs):
+        if isinstance(messages, list):
+            messages = self._mark_static_prefix(messages)
+        return super().call(messages, *args, **kwargs)
+
+    def _mark_static_prefix(self, messages):
+        prefix, index, rest = split_static_prefix(messages)
+        if prefix is None:
+            return messages
+        hit = self.prefix_cache.register(prefix)
+        if not self.prefix_cache.should_use_gemini_cache(prefix):
+            return messages
+
+        with self.prefix_cache._lock:
+            self.prefix_cache.stats["sent_to_gemini_cache"] += 1
+            if hit:
+                # The first call stores the prefix, the next ones read it from the cache
+                self.prefix_cache.stats["cached_prefix_tokens"] += _estimate_tokens(prefix)
+        content = [{"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}]
+        marked = [{**messages[index], "content": content}]
+        if rest:
+            # The dynamic part of the same message becomes its own message after the cached one
+            marked.append({"role": messages[index]["role"], "content": rest})
+        return messages[:index] + marked + messages[index + 1:]
+
+
+class PrefixCachingLLM(PrefixCaching, LLM):
+    pass
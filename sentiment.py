@@ -0,0 +1,138 @@
+from collections import OrderedDict
+import hashlib, re, threading
+import numpy as np
+
+# Word valence from -3 (very negative) to +3 (very positive), tuned for business communication
+LEXICON = {
+    # positive
+    "excellent": 3, "outstanding": 3, "exceptional": 3, "thrilled": 3, "delighted": 3, "love": 3,
+    "amazing": 3, "fantastic": 3, "great": 2.5, "excited": 2.5, "impressive": 2.5, "congratulations": 2.5,
+    "congrats": 2.5, "success": 2, "successful": 2, "innovative": 2, "valuable": 2, "happy": 2,
+    "pleased": 2, "glad": 2, "good": 1.5, "best": 2, "benefit": 1.5, "benefits": 1.5, "improve": 1.5,
+    "improved": 1.5, "improvement": 1.5, "growth": 1.5, "grow": 1.5, "opportunity": 1.5,
+    "opportunities": 1.5, "support": 1, "supporting": 1, "helpful": 1.5, "help": 1, "efficient": 1.5,
+    "effective": 1.5, "seamless": 1.5, "seamlessly": 1.5, "easy": 1, "reliable": 1.5, "trusted": 1.5,
+    "partner": 1, "partnership": 1.5, "achieve": 1.5, "achievement": 2, "achievements": 2,
+    "milestone": 1.5, "recognized": 1.5, "leading": 1, "strong": 1, "thank": 1.5, "thanks": 1.5,
+    "appreciate": 2, "appreciated": 2, "welcome": 1, "enjoy": 1.5, "inspiring": 2, "empower": 1.5,
+    "empowering": 1.5, "save": 1, "saves": 1, "savings": 1, "faster": 1, "scalable": 1, "secure": 1,
+    "interested": 1, "interesting": 1, "looking forward": 1.5, "value": 1, "win": 2, "wins": 2,
+    "resolved": 1.5, "satisfied": 2, "smooth": 1, "proud": 2, "perfect": 2.5, "positive": 1.5,
+    # negative
+    "terrible": -3, "awful": -3, "horrible": -3, "hate": -3, "worst": -3, "disappointed": -2.5,
+    "disappointing": -2.5, "frustrated": -2.5, "frustrating": -2.5, "angry": -2.5, "unacceptable": -2.5,
+    "fail": -2, "failed": -2, "failure": -2, "failing": -2, "problem": -1.5, "problems": -1.5,
+    "issue": -1, "issues": -1, "bad": -2, "poor": -2, "slow": -1.5, "expensive": -1.5, "costly": -1.5,
+    "difficult": -1.5, "hard": -1, "harder": -1, "complicated": -1.5, "complex": -0.5, "confusing": -1.5,
+    "risk": -1, "risky": -1.5, "struggle": -1.5, "struggling": -1.5, "pain": -1.5, "concern": -1,
+    "concerns": -1, "worried": -1.5, "worry": -1.5, "unfortunately": -1.5, "sorry": -1, "delay": -1.5,
+    "delayed": -1.5, "blocked": -1.5, "stuck": -1.5, "waste": -2, "wasted": -2, "annoying": -2,
+    "spam": -2.5, "pushy": -2, "urgent": -0.5, "limited": -0.5, "lose": -1.5, "losing": -1.5,
+    "loss": -1.5, "mistake": -1.5, "wrong": -1.5, "broken": -2, "missing": -1, "persists": -1,
+    "unresolved": -2, "negative": -1.5, "reject": -2, "rejected": -2, "cancel": -1.5,
+}
+NEGATORS = {"not", "no", "never", "don't", "doesn't", "didn't", "isn't", "wasn't", "aren't", "won't",
+            "can't", "cannot", "without", "hardly", "nor"}
+INTENSIFIERS = {"very": 1.3, "really": 1.3, "extremely": 1.5, "incredibly": 1.5, "truly": 1.2,
+                "highly": 1.3, "so": 1.2, "super": 1.3, "slightly": 0.6, "somewhat": 0.7, "quite": 1.1}
+NEGATION_WINDOW = 3
+# Same normalization as VADER: score / sqrt(score^2 + alpha) maps any sum into (-1, 1)
+ALPHA = 15.0
+
+# Multi-word lexicon entries are joined with "_" before tokenizing.
+# Sentence punctuation is kept as a token: a negation never crosses it
+_TOKEN = re.compile(r"[a-z_]+(?:'[a-z]+)?|[.!?;]")
+SENTENCE_ENDS = {".", "!", "?", ";"}
+
+
+class SentimentScorer:
+    """
+    Local, lexicon-based sentiment scorer, no network and no LLM call.
+    Texts are tokenized once, then the whole batch is scored with a single vectorized
+    weighted bincount. Scores are kept in an LRU cache by text hash.
+    """
+
+    def __init__(self, lexicon=LEXICON, cache_size=10_000):
+        phrases = {word: weight for word, weight in lexicon.items() if " " in word}
+        self.phrases = [(phrase, phrase.replace(" ", "_")) for phrase in phrases]
+        self.vocabulary = {word.replace(" ", "_"): index for index, word in enumerate(lexicon)}
+        self.weights = np.array(list(lexicon.values()), dtype=np.float64)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def _tokens(self, text):
+        text = text.lower().replace("’", "'")
+        for phrase, joined in self.phrases:
+            text = text.replace(phrase, joined)
+        return _TOKEN.findall(text)
+
+    def _features(self, texts):
+        # Flat arrays over the batch: document of each lexicon hit, its lexicon index and its modifier
+        documents, terms, modifiers = [], [], []
+        for document, text in enumerate(texts):
+            tokens = self._tokens(text)
+            negated_until = -1
+            for position, token in enumerate(tokens):
+                if token in SENTENCE_ENDS:
+                    negated_until = -1
+                    continue
+                if token in NEGATORS:
+                    # A negation only applies to the next sentiment word within the window
+                    negated_until = position + NEGATION_WINDOW
+                    continue
+                term = self.vocabulary.get(token)
+                if term is None:
+                    continue
+                modifier = 1.0
+                if position <= negated_until:
+                    modifier = -0.75  # "not great" is mildly negative, not the opposite of great
+                    negated_until = -1
+                if position > 0 and tokens[position - 1] in INTENSIFIERS:
+                    modifier *= INTENSIFIERS[tokens[position - 1]]
+                documents.append(document)
+                terms.append(term)
+                modifiers.append(modifier)
+        return np.array(documents, dtype=np.int64), np.array(terms, dtype=np.int64), np.array(modifiers)
+
+    def _score(self, texts):
+        documents, terms, modifiers = self._features(texts)
+        values = self.weights[terms] * modifiers if len(terms) else np.zeros(0)
+        totals = np.bincount(documents, weights=values, minlength=len(texts))
+        positive = np.bincount(documents, weights=np.clip(values, 0, None), minlength=len(texts))
+        negative = np.bincount(documents, weights=np.clip(values, None, 0), minlength=len(texts))
+        compound = totals / np.sqrt(totals ** 2 + ALPHA)
+        return [
+            {"label": _label(score), "score": round(float(score), 3),
+             "positive": round(float(pos), 2), "negative": round(float(neg), 2)}
+            for score, pos, neg in zip(compound, positive, negative)
+        ]
+
+    def score_batch(self, texts):
+        keys = [hashlib.sha256(text.encode()).hexdigest() for text in texts]
+        with self._lock:
+            cached = {key: self.cache[key] for key in keys if key in self.cache}
+            for key in cached:
+                self.cache.move_to_end(key)
+        missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+        if missing:
+            scores = dict(zip(missing, self._score(list(missing.values()))))
+            with self._lock:
+                for key, score in scores.items():
+                    self.cache[key] = score
+                while len(self.cache) > self.cache_size:
+                    # Least recently used first
+                    self.cache.popitem(last=False)
+            cached.update(scores)
+        return [cached[key] for key in keys]
+
+    def score(self, text):
+        return self.score_batch([text])[0]
+
+
+def _label(score):
+    if score >= 0.05:
+        return "positive"
+    if score <= -0.05:
+        return "negative"
+    return "neutral"
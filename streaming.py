@@ -0,0 +1,135 @@
+from crewai.utilities.events import (
+    AgentExecutionStartedEvent,
+    LLMCallStartedEvent,
+    LLMStreamChunkEvent,
+    TaskCompletedEvent,
+    TaskFailedEvent,
+    TaskStartedEvent,
+)
+from crewai.utilities.events.base_event_listener import BaseEventListener
+from helpers import StreamPrinter
+import os, threading
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+
+class StreamingOutput(BaseEventListener):
+    """
+    Streams the final answer of each task while the LLM generates it.
+    Needs an LLM created with stream=True. Tokens are written incrementally to the task's
+    output_file (crewAI still writes the complete output when the task finishes), or to the file
+    returned by output_path(task) when given, e.g. RunOutputSink.stream_path, forwarded to
+    an optional on_token(task, text) callback, and printed to stdout for the tasks listed in
+    stdout_tasks. Thoughts and tool calls of the ReAct loop are skipped: only the text after
+    "Final Answer:" is streamed. When a guardrail rejects the answer and the agent runs the
+    task again, the output file is truncated and the console shows that a new attempt starts.
+    printed(task) tells whether the last attempt of a stdout task reached the console, e.g. to
+    print the result at the end when the "Final Answer:" marker never arrived.
+    """
+
+    def __init__(self, stdout_tasks=(), on_token=None, output_path=None):
+        self.stdout_tasks = list(stdout_tasks)
+        self.on_token = on_token
+        self.output_path = output_path or (lambda task: getattr(task, "output_file", None))
+        # Tasks with async_execution=True run in their own thread, so the state is kept per thread
+        self._state = {}
+        # id() of the stdout tasks whose answer was printed
+        self._printed = set()
+        super().__init__()
+
+    def printed(self, task):
+        return id(task) in self._printed
+
+    def _current(self):
+        return self._state.get(threading.get_ident())
+
+    def _forward(self, state, text):
+        if not text:
+            return
+        if state["file"]:
+            state["file"].write(text)
+            state["file"].flush()
+        if state["printer"]:
+            state["printer"].feed(text)
+            self._printed.add(id(state["task"]))
+        if self.on_token:
+            self.on_token(state["task"], text)
+
+    def _close(self):
+        state = self._state.pop(threading.get_ident(), None)
+        if not state:
+            return
+        if state["file"]:
+            state["file"].close()
+        if state["printer"]:
+            state["printer"].flush()
+
+    def setup_listeners(self, crewai_event_bus):
+        @crewai_event_bus.on(TaskStartedEvent)
+        def on_task_started(source, event):
+            self._close()
+            output_file = self.output_path(source)
+            if output_file:
+                directory = os.path.dirname(output_file)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+            self._state[threading.get_ident()] = {
+                "task": source,
+                "file": open(output_file, "w") if output_file else None,
+                "printer": StreamPrinter() if any(source is task for task in self.stdout_tasks) else None,
+                "pending": "",
+                "answering": False,
+                "attempts": 0,
+            }
+
+        @crewai_event_bus.on(AgentExecutionStartedEvent)
+        def on_agent_execution_started(source, event):
+            # Fired for the first attempt and for every guardrail retry of the task
+            state = self._current()
+            if not state or event.task is not state["task"]:
+                return
+            state["attempts"] += 1
+            if state["attempts"] == 1:
+                return
+            if state["file"]:
+                state["file"].seek(0)
+                state["file"].truncate()
+            if state["printer"]:
+                state["printer"].flush()
+                print(f"\n[Answer rejected, attempt {state['attempts']}]\n", flush=True)
+                state["printer"] = StreamPrinter()
+            state["pending"] = ""
+            state["answering"] = False
+            self._printed.discard(id(state["task"]))
+
+        @crewai_event_bus.on(LLMCallStartedEvent)
+        def on_llm_started(source, event):
+            # Every step of the agent loop is a new LLM call, only the one that gives the final answer is streamed
+            state = self._current()
+            if state:
+                state["pending"] = ""
+                state["answering"] = False
+
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def on_chunk(source, event):
+            state = self._current()
+            if not state:
+                return
+            if state["answering"]:
+                self._forward(state, event.chunk)
+                return
+            # The marker can be split across chunks, so keep the text until it shows up
+            state["pending"] += event.chunk
+            position = state["pending"].find(FINAL_ANSWER_MARKER)
+            if position >= 0:
+                state["answering"] = True
+                self._forward(state, state["pending"][position + len(FINAL_ANSWER_MARKER):].lstrip())
+                state["pending"] = ""
+
+        @crewai_event_bus.on(TaskCompletedEvent)
+        def on_task_completed(source, event):
+            self._close()
+
+        @crewai_event_bus.on(TaskFailedEvent)
+        def on_task_failed(source, event):
+            self._close()
@@ -0,0 +1,247 @@
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM
+from crewai.tasks.output_format import OutputFormat
+from pydantic import ValidationError
+import copy, json, re
+
+_decoder = json.JSONDecoder()
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def extract_json(text):
+    """
+    Returns the first JSON value found in an LLM answer, or None.
+    Tries a plain parse first, then repairs the usual small mistakes locally:
+    ```json fences, text around the JSON, single quotes, Python True/False/None,
+    // comments, trailing commas and brackets left open by a truncated answer.
+    """
+    text = text or ""
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    start = min((position for position in (text.find("{"), text.find("[")) if position >= 0), default=-1)
+    if start < 0:
+        return None
+    text = text[start:]
+    for candidate in (text, _repair(text)):
+        try:
+            return _decoder.raw_decode(candidate)[0]
+        except ValueError:
+            continue
+    return None
+
+
+def _repair(text):
+    output, stack = [], []
+    quote = None  # quote character of the string being copied, if any
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if quote:
+            if char == "\\" and index + 1 < len(text):
+                output.append(text[index:index + 2])
+                index += 2
+                continue
+            if char == quote:
+                output.append('"')
+                quote = None
+            elif char == '"':
+                # A double quote inside a single-quoted string
+                output.append('\\"')
+            elif char == "\n":
+                output.append("\\n")
+            else:
+                output.append(char)
+        elif char in "\"'":
+            quote = char
+            output.append('"')
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            output.append(char)
+        elif char in "}]":
+            _drop_trailing_comma(output)
+            if stack:
+                stack.pop()
+            output.append(char)
+            if not stack:
+                break
+        elif text.startswith("//", index):
+            # Comment until the end of the line
+            newline = text.find("\n", index)
+            index = len(text) if newline < 0 else newline
+            continue
+        elif char.isalpha():
+            word = re.match(r"[A-Za-z_]+", text[index:]).group(0)
+            output.append(_PYTHON_LITERALS.get(word, word))
+            index += len(word)
+            continue
+        else:
+            output.append(char)
+        index += 1
+
+    # Truncated answer: close the open string and brackets
+    if quote:
+        output.append('"')
+    _drop_trailing_comma(output)
+    output.extend(reversed(stack))
+    return "".join(output)
+
+
+def _drop_trailing_comma(output):
+    position = len(output) - 1
+    while position >= 0 and output[position].isspace():
+        position -= 1
+    if position >= 0 and output[position] == ",":
+        del output[position]
+
+
+def schema_instructions(model):
+    schema = json.dumps(model.model_json_schema(), separators=(",", ":"))
+    return (
+        "\nYour final answer must be only a JSON object, without any text or code block around it, "
+        f"that follows this JSON schema:\n{schema}"
+    )
+
+
+def schema_llm(llm, model):
+    # Same LLM settings, but Gemini is told to follow the JSON schema of the model
+    constrained = copy.copy(llm)
+    constrained.response_format = model
+    constrained.stream = False
+    # RoutedLLM may answer with its lite model, which needs the schema too
+    if getattr(constrained, "lite_llm", None) is not None:
+        constrained.lite_llm = copy.copy(constrained.lite_llm)
+        constrained.lite_llm.response_format = model
+        constrained.lite_llm.stream = False
+    return constrained
+
+
+class SchemaAnswerLLM(BaseLLM):
+    """
+    LLM of an agent without tools working on a structured-output task: Gemini answers
+    directly in the JSON schema (constrained decoding), given to crewAI as the final answer.
+    """
+
+    def __init__(self, llm, model):
+        super().__init__(model=llm.model, temperature=llm.temperature)
+        self.llm = schema_llm(llm, model)
+
+    def call(self, messages, *args, **kwargs):
+        answer = self.llm.call(messages, *args, **kwargs)
+        if not isinstance(answer, str):
+            return answer
+        return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+    def supports_function_calling(self):
+        return False
+
+    def supports_stop_words(self):
+        return False
+
+    def get_context_window_size(self):
+        return self.llm.get_context_window_size()
+
+
+class StructuredOutput:
+    """
+    Task guardrail that turns the agent's answer into a Pydantic model without the extra
+    conversion LLM call crewAI makes when output_pydantic/output_json cannot be parsed.
+    1. Local fast path: parse and repair the JSON, validate it with the model.
+    2. If that fails and llm is given, one conversion call with the model as Gemini's native
+       response schema (constrained decoding), at most max_llm_repairs per answer.
+    3. Otherwise the validation error goes back to the agent, which retries the task up to
+       the task's max_retries. So an output costs at most (max_retries + 1) * (1 + max_llm_repairs) calls.
+    """
+
+    def __init__(self, model, llm=None, max_llm_repairs=1, as_json=False):
+        self.model = model
+        self.llm = llm
+        self.max_llm_repairs = max_llm_repairs if llm is not None else 0
+        self.as_json = as_json
+        self.stats = {"fast_path": 0, "llm_repairs": 0, "agent_retries": 0}
+
+    def validate(self, text):
+        data = extract_json(text)
+        if data is None:
+            return None, "The answer does not contain a JSON object."
+        try:
+            return self.model.model_validate(data), None
+        except ValidationError as error:
+            return None, str(error)
+
+    def __call__(self, task_output):
+        instance, error = self.validate(task_output.raw)
+        if instance is not None:
+            self.stats["fast_path"] += 1
+            return True, self._with_model(task_output, instance)
+
+        for _ in range(self.max_llm_repairs):
+            self.stats["llm_repairs"] += 1
+            answer = schema_llm(self.llm, self.model).call([
+                {"role": "system", "content": "Convert the text to JSON that follows the given schema. "
+                                              "Only use information from the text."},
+                {"role": "user", "content": f"Text:\n{task_output.raw}\n\nPrevious error:\n{error}"},
+            ])
+            instance, error = self.validate(answer)
+            if instance is not None:
+                return True, self._with_model(task_output, instance)
+
+        self.stats["agent_retries"] += 1
+        return False, (
+            "Your final answer is not valid for the required JSON schema. "
+            f"Fix these errors and answer again only with the JSON object:\n{error}"
+        )
+
+    def _with_model(self, task_output, instance):
+        output = task_output.model_copy()
+        output.raw = instance.model_dump_json()
+        if self.as_json:
+            output.json_dict = instance.model_dump()
+            output.output_format = OutputFormat.JSON
+        else:
+            output.pydantic = instance
+            output.output_format = OutputFormat.PYDANTIC
+        return output
+
+
+def rebuild_task(task, **updates):
+    """
+    Returns a new Task with the fields of `task` and the updates, built through the Task validators.
+    Assigning task.guardrail after construction is silently ignored by the crewAI versions that turn
+    the guardrail into a private callable when the task is built. `id` is left to the new task and
+    `config` is dropped, its values are already in the fields.
+    """
+    fields = {
+        name: getattr(task, name) for name in task.model_fields_set
+        if name in type(task).model_fields and name not in ("id", "config")
+    }
+    return type(task).model_validate({**fields, **updates})
+
+
+def with_structured_output(task, model, llm=None, max_llm_repairs=1, max_retries=2, as_json=False,
+                           native_schema=True):
+    """
+    Replaces output_pydantic=model (or output_json=model with as_json=True) on a task:
+    the JSON schema is added to the expected output so the agent answers in JSON directly,
+    and the StructuredOutput guardrail validates it locally.
+    With native_schema, an agent without tools gets a copy with a SchemaAnswerLLM for this task,
+    so its first answer is already constrained to the schema. Agents with tools keep their LLM:
+    their tool steps are not JSON.
+    Returns a new task, built with the guardrail: use the returned task in the crew.
+    Its StructuredOutput (and stats) is task.guardrail.__self__.
+    """
+    structured_output = StructuredOutput(model, llm=llm, max_llm_repairs=max_llm_repairs, as_json=as_json)
+    agent = task.agent
+    if native_schema and agent is not None and not agent.tools and isinstance(agent.llm, LLM):
+        agent = agent.copy()
+        agent.llm = SchemaAnswerLLM(task.agent.llm, model)
+    return rebuild_task(
+        task,
+        agent=agent,
+        output_pydantic=None,
+        output_json=None,
+        expected_output=task.expected_output.rstrip() + schema_instructions(model),
+        # A bound method and not the instance: crewAI reads the source of the guardrail for its events
+        guardrail=structured_output.__call__,
+        max_retries=max_retries,
+    )
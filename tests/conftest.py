@@ -0,0 +1,6 @@
+import os, sys
+
+# The modules under test live in the repository root and in the example folders, which are not packages
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in ("", "ex8_progress_report", "ex9_automated_sales"):
+    sys.path.insert(0, os.path.join(ROOT, directory))
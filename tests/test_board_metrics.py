@@ -0,0 +1,38 @@
+import json, os
+import pytest
+
+pd = pytest.importorskip("pandas")
+from board_metrics import compute_metrics, format_metrics
+from board_snapshots import list_names
+from conftest import ROOT
+
+FIXTURES_DIR = os.path.join(ROOT, "ex8_progress_report", "fixtures")
+
+
+def load(name):
+    with open(os.path.join(FIXTURES_DIR, name), "r") as file:
+        return json.load(file)
+
+
+def test_fixture_lists_are_named():
+    cards, lists = load("board_cards.json"), load("board_lists.json")
+    names = list_names(cards, lists)
+    assert {names[card["idList"]] for card in cards} == {"TODO", "In Progress", "Done"}
+
+
+def test_fixture_done_and_progress():
+    cards, lists = load("board_cards.json"), load("board_lists.json")
+    metrics = compute_metrics(cards, list_names(cards, lists), now="2024-08-20T00:00:00Z")
+    assert metrics["total_cards"] == 4
+    assert metrics["done"] == 1
+    assert metrics["progress"] == pytest.approx(25.0)
+    # The done card is neither stale nor overdue, every row of the per-list table has a name
+    assert metrics["stale"] == 0
+    assert list(metrics["per_list"].index) == ["TODO", "In Progress", "Done"]
+    assert "66c3" not in format_metrics(metrics)
+
+
+def test_comment_names_fill_missing_lists():
+    cards = load("board_cards.json")
+    names = list_names(cards)
+    assert names == {"66c308f676b057fdfbd5fdb3": "TODO"}
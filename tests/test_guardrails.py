@@ -0,0 +1,101 @@
+import pytest
+
+crewai = pytest.importorskip("crewai")
+BaseLLM = pytest.importorskip("crewai.llms.base_llm").BaseLLM
+from crewai import Agent, Task
+from pydantic import BaseModel
+from structured_output import rebuild_task, with_structured_output
+
+
+class ScriptedLLM(BaseLLM):
+    """Answers the agent with the next scripted final answer, without any network call."""
+
+    def __init__(self, model, answers):
+        super().__init__(model=model)
+        self.answers = list(answers)
+
+    def call(self, messages, *args, **kwargs):
+        return f"Thought: I now know the final answer\nFinal Answer: {self.answers.pop(0)}"
+
+    def supports_function_calling(self):
+        return False
+
+
+class Venue(BaseModel):
+    name: str
+    capacity: int
+
+
+def make_task(answers):
+    agent = Agent(role="Venue Coordinator", goal="Find a venue", backstory="Knows every venue.",
+                  llm=ScriptedLLM(model="scripted", answers=answers))
+    return Task(description="Find a venue.", expected_output="The chosen venue.", agent=agent)
+
+
+def test_structured_output_guardrail_runs():
+    task = with_structured_output(make_task(["```json\n{'name': 'Moscone', 'capacity': 500,}\n```"]), Venue)
+    output = task.execute_sync()
+    assert output.pydantic == Venue(name="Moscone", capacity=500)
+    assert task.guardrail.__self__.stats["fast_path"] == 1
+
+
+def test_rebuilt_task_calls_the_guardrail_and_retries():
+    calls = []
+
+    def guardrail(task_output):
+        calls.append(task_output.raw)
+        if len(calls) == 1:
+            return False, "Answer again, with more detail."
+        return True, task_output
+
+    task = rebuild_task(make_task(["short", "a longer answer"]), guardrail=guardrail, max_retries=2)
+    output = task.execute_sync()
+    assert calls == ["short", "a longer answer"]
+    assert output.raw == "a longer answer"
+
+
+def test_hybrid_crew_review_guardrail_runs():
+    from hybrid_process import HybridCrew
+    manager = ScriptedLLM(model="manager", answers=[])
+    manager_answers = ["REVISE: name the venue.", "APPROVE"]
+    manager.call = lambda messages, *args, **kwargs: manager_answers.pop(0)
+    task = make_task(["I can't find a venue.", "Moscone Center, 500 seats."])
+    crew = HybridCrew(agents=[task.agent], tasks=[task], manager_llm=manager, plan_with_manager=False,
+                      confidence_check=lambda text: True, max_reviews=2, verbose=False)
+    result = crew.kickoff()
+    assert crew.manager_calls == 2
+    assert result.raw == "Moscone Center, 500 seats."
+
+
+def test_hybrid_crew_escalates_rejected_outputs_of_the_planned_agent():
+    from hybrid_process import HybridCrew
+    manager = ScriptedLLM(model="manager", answers=[])
+    prompts, manager_answers = [], ["REVISE: give the capacity."]
+    manager.call = lambda messages, *args, **kwargs: prompts.append(messages[-1]["content"]) or manager_answers.pop(0)
+    agent = make_task([]).agent
+    agent.llm = ScriptedLLM(model="scripted", answers=["Moscone Center.", "Moscone Center, 500 seats."])
+    # No agent on the task, the plan assigns it
+    task = Task(description="Find a venue.", expected_output="The chosen venue.",
+                guardrail=lambda output: (True, output) if "seats" in output.raw else (False, "No capacity."))
+    crew = HybridCrew(agents=[agent], tasks=[task], manager_llm=manager, plan_with_manager=False,
+                      confidence_check=lambda text: False, verbose=False)
+    result = crew.kickoff()
+    assert crew.manager_calls == 1
+    assert "Venue Coordinator" in prompts[0] and "No capacity." in prompts[0]
+    assert result.raw == "Moscone Center, 500 seats."
+
+
+def test_structured_output_sends_the_native_schema_on_the_first_answer():
+    from crewai import Crew, LLM
+
+    class SchemaLLM(LLM):
+        def call(self, messages, *args, **kwargs):
+            assert self.response_format is Venue
+            return '{"name": "Moscone", "capacity": 500}'
+
+    task = make_task([])
+    original_llm = task.agent.llm = SchemaLLM(model="gemini/gemini-2.0-flash")
+    task = with_structured_output(task, Venue)
+    result = Crew(agents=[task.agent], tasks=[task], verbose=False).kickoff()
+    assert result.pydantic == Venue(name="Moscone", capacity=500)
+    assert original_llm.response_format is None
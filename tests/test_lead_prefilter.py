@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("numpy")
+from lead_prefilter import LeadPrefilter
+
+ICP_LEAD = {
+    "name": "João Moura", "job_title": "Director of Engineering", "company": "Clearbit",
+    "email": "joao@clearbit.com", "use_case": "Using AI Agent to do better data enrichment.",
+}
+STUDENT_LEAD = {
+    "name": "Sam Taylor", "job_title": "Student", "company": "",
+    "email": "sam.taylor@gmail.com", "use_case": "Homework for a course.",
+}
+
+
+def test_sparse_leads_are_kept():
+    # Missing fields are no evidence of an unqualified lead
+    sparse = [
+        {"name": "Alex Doe", "job_title": "", "company": "Acme", "email": "alex@acme.com", "use_case": ""},
+        {"name": "Alex Doe", "job_title": "Account Executive", "company": "Acme", "email": "alex@acme.com", "use_case": ""},
+        {"name": "Alex Doe", "job_title": "", "company": "Acme", "email": "alex@acme.com", "use_case": "Automate our sales workflow."},
+    ]
+    kept, dropped = LeadPrefilter().split(sparse)
+    assert len(kept) == 3 and dropped == []
+
+
+def test_obviously_unqualified_lead_is_dropped():
+    kept, dropped = LeadPrefilter().split([{"lead_data": ICP_LEAD}, {"lead_data": STUDENT_LEAD}])
+    assert [lead["lead_data"]["name"] for lead in kept] == ["João Moura"]
+    assert dropped[0]["prefilter_score"] < 20
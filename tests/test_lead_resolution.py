@@ -0,0 +1,45 @@
+import time
+from lead_resolution import LeadResolver
+
+
+def test_free_email_domain_is_not_a_block():
+    leads = [
+        {"name": "John Smith", "email": "jsmith@gmail.com", "company": "Acme"},
+        {"name": "Jon Smith", "email": "jon.s@gmail.com", "company": "Globex"},
+    ]
+    resolved = LeadResolver().resolve(leads)
+    assert [lead["sources"] for lead in resolved] == [1, 1]
+
+
+def test_fuzzy_match_within_company():
+    leads = [
+        {"name": "John Smith", "email": "john@acme.com", "company": "Acme Inc"},
+        {"name": "Jon Smith", "email": "", "company": "ACME", "job_title": "CTO"},
+    ]
+    resolved = LeadResolver().resolve(leads)
+    assert len(resolved) == 1
+    assert resolved[0]["sources"] == 2
+    assert resolved[0]["lead_data"]["job_title"] == "CTO"
+
+
+def test_lead_id_does_not_change_when_a_duplicate_adds_an_email():
+    first = {"name": "Jon Smith", "email": "", "company": "ACME"}
+    alone = LeadResolver().resolve([first])
+    merged = LeadResolver().resolve([first, {"name": "John Smith", "email": "john@acme.com", "company": "Acme Inc"}])
+    assert merged[0]["lead_data"]["email"] == "john@acme.com"
+    assert merged[0]["lead_id"] == alone[0]["lead_id"]
+
+
+def test_different_companies_on_one_domain_are_not_merged():
+    leads = [
+        {"name": "John Smith", "email": "jsmith@group.com", "company": "Group Retail"},
+        {"name": "Jon Smith", "email": "jon.smith@group.com", "company": "Group Bank"},
+    ]
+    assert len(LeadResolver().resolve(leads)) == 2
+
+
+def test_many_free_email_leads_stay_fast():
+    leads = [{"name": f"Person {index}", "email": f"person{index}@gmail.com"} for index in range(4000)]
+    start = time.perf_counter()
+    assert len(LeadResolver().resolve(leads)) == 4000
+    assert time.perf_counter() - start < 5
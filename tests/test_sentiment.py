@@ -0,0 +1,36 @@
+import hashlib
+import pytest
+
+pytest.importorskip("numpy")
+from sentiment import SentimentScorer
+
+
+def text_key(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def test_negation_flips_the_next_sentiment_word():
+    scorer = SentimentScorer()
+    assert scorer.score("The onboarding was great.")["label"] == "positive"
+    assert scorer.score("The onboarding was not great.")["label"] == "negative"
+
+
+def test_negation_stops_at_the_end_of_the_sentence():
+    scorer = SentimentScorer()
+    assert scorer.score("We did not expect it. Great work!")["label"] == "positive"
+    assert scorer.score("No. Excellent results")["label"] == "positive"
+
+
+def test_batch_scores_match_single_scores():
+    scorer = SentimentScorer()
+    texts = ["Thanks, this is very helpful!", "Unfortunately the demo was broken.", "See you on Monday."]
+    assert scorer.score_batch(texts) == [SentimentScorer().score(text) for text in texts]
+    assert [score["label"] for score in scorer.score_batch(texts)] == ["positive", "negative", "neutral"]
+
+
+def test_cache_evicts_the_least_recently_used_text():
+    scorer = SentimentScorer(cache_size=2)
+    scorer.score_batch(["good", "bad"])
+    scorer.score("good")
+    scorer.score("great")
+    assert list(scorer.cache) == [text_key("good"), text_key("great")]
@@ -0,0 +1,200 @@
+from crewai.utilities.events import (
+    AgentExecutionCompletedEvent,
+    AgentExecutionErrorEvent,
+    AgentExecutionStartedEvent,
+    CrewKickoffCompletedEvent,
+    CrewKickoffStartedEvent,
+    LLMCallCompletedEvent,
+    LLMCallFailedEvent,
+    LLMCallStartedEvent,
+    TaskCompletedEvent,
+    TaskFailedEvent,
+    TaskStartedEvent,
+    ToolUsageErrorEvent,
+    ToolUsageFinishedEvent,
+    ToolUsageStartedEvent,
+)
+from crewai.utilities.events.base_event_listener import BaseEventListener
+from collections import defaultdict
+from contextlib import contextmanager
+import json, os, sys, threading, time
+
+# Tools crewAI adds to agents with allow_delegation=True (and to the manager of hierarchical crews)
+DELEGATION_TOOLS = ("delegate work to coworker", "ask question to coworker")
+
+
+def _now_us():
+    return time.time() * 1_000_000
+
+
+def _short(text, limit=60):
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+class Tracer(BaseEventListener):
+    """
+    Records a span around every crew kickoff, task, agent execution, LLM call and tool run
+    (delegations are tool runs of the "Delegate work to coworker" tool) and saves them in
+    Chrome trace format. Open the file in https://ui.perfetto.dev or chrome://tracing to see
+    a flame graph, or run `python tracing.py trace.json` for the top time sinks.
+    """
+
+    def __init__(self, path="trace.json"):
+        self.path = path
+        self.events = []
+        self._lock = threading.Lock()
+        # Open spans per (thread, kind), a stack because tools and delegations nest
+        self._open = defaultdict(list)
+        super().__init__()
+
+    def _start(self, kind, name, cat, **args):
+        self._open[(threading.get_ident(), kind)].append((name, cat, _now_us(), args))
+
+    def _end(self, kind, **args):
+        stack = self._open[(threading.get_ident(), kind)]
+        if not stack:
+            return
+        name, cat, start, start_args = stack.pop()
+        self._add(name, cat, start, _now_us() - start, {**start_args, **args})
+
+    def _add(self, name, cat, start, duration, args):
+        # "X" is a complete event: a span with a start timestamp and a duration, both in microseconds
+        event = {
+            "name": name, "cat": cat, "ph": "X", "ts": start, "dur": duration,
+            "pid": os.getpid(), "tid": threading.get_ident(),
+            "args": {key: str(value) for key, value in args.items()},
+        }
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name, cat="code", **args):
+        # Manual span for code outside of crewAI, e.g. `with tracer.span("load leads"): ...`
+        start = _now_us()
+        try:
+            yield
+        finally:
+            self._add(name, cat, start, _now_us() - start, args)
+
+    def setup_listeners(self, crewai_event_bus):
+        @crewai_event_bus.on(CrewKickoffStartedEvent)
+        def on_crew_started(source, event):
+            self._start("crew", f"Crew {event.crew_name}", "crew")
+
+        @crewai_event_bus.on(CrewKickoffCompletedEvent)
+        def on_crew_completed(source, event):
+            self._end("crew")
+
+        @crewai_event_bus.on(TaskStartedEvent)
+        def on_task_started(source, event):
+            self._start("task", f"Task {_short(getattr(source, 'name', None) or getattr(source, 'description', ''))}", "task")
+
+        @crewai_event_bus.on(TaskCompletedEvent)
+        def on_task_completed(source, event):
+            self._end("task")
+
+        @crewai_event_bus.on(TaskFailedEvent)
+        def on_task_failed(source, event):
+            self._end("task", error=event.error)
+
+        @crewai_event_bus.on(AgentExecutionStartedEvent)
+        def on_agent_started(source, event):
+            self._start("agent", f"Agent {event.agent.role.strip()}", "agent")
+
+        @crewai_event_bus.on(AgentExecutionCompletedEvent)
+        def on_agent_completed(source, event):
+            self._end("agent")
+
+        @crewai_event_bus.on(AgentExecutionErrorEvent)
+        def on_agent_error(source, event):
+            self._end("agent", error=event.error)
+
+        @crewai_event_bus.on(LLMCallStartedEvent)
+        def on_llm_started(source, event):
+            self._start("llm", f"LLM {getattr(source, 'model', 'unknown')}", "llm")
+
+        @crewai_event_bus.on(LLMCallCompletedEvent)
+        def on_llm_completed(source, event):
+            self._end("llm")
+
+        @crewai_event_bus.on(LLMCallFailedEvent)
+        def on_llm_failed(source, event):
+            self._end("llm", error=event.error)
+
+        @crewai_event_bus.on(ToolUsageStartedEvent)
+        def on_tool_started(source, event):
+            is_delegation = event.tool_name.strip().lower() in DELEGATION_TOOLS
+            self._start(
+                "tool", f"{'Delegation' if is_delegation else 'Tool'} {event.tool_name}",
+                "delegation" if is_delegation else "tool",
+                agent=event.agent_role, tool_args=_short(str(event.tool_args), 200),
+            )
+
+        @crewai_event_bus.on(ToolUsageFinishedEvent)
+        def on_tool_finished(source, event):
+            self._end("tool", from_cache=getattr(event, "from_cache", False))
+
+        @crewai_event_bus.on(ToolUsageErrorEvent)
+        def on_tool_error(source, event):
+            self._end("tool", error=event.error)
+
+    def save(self, path=None):
+        with self._lock:
+            events = list(self.events)
+        with open(path or self.path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        return path or self.path
+
+    def print_summary(self, top=10):
+        with self._lock:
+            events = list(self.events)
+        print_summary(summarize(events), top)
+
+
+def summarize(events):
+    """
+    Aggregates spans by category and name.
+    total_s is the wall time inside the span, self_s excludes the time spent in nested spans,
+    so the largest self_s values are where the time actually went.
+    """
+    totals = defaultdict(lambda: {"count": 0, "total_s": 0.0, "self_s": 0.0})
+    by_thread = defaultdict(list)
+    for event in events:
+        if event.get("ph") == "X":
+            by_thread[(event["pid"], event["tid"])].append(event)
+
+    for thread_events in by_thread.values():
+        # Parents start first and, on ties, are the longer span
+        thread_events.sort(key=lambda event: (event["ts"], -event["dur"]))
+        stack = []  # [event, time covered by direct children]
+        for event in thread_events:
+            while stack and event["ts"] >= stack[-1][0]["ts"] + stack[-1][0]["dur"]:
+                _close(stack.pop(), totals)
+            if stack:
+                stack[-1][1] += event["dur"]
+            stack.append([event, 0.0])
+        while stack:
+            _close(stack.pop(), totals)
+    return dict(sorted(totals.items(), key=lambda item: item[1]["self_s"], reverse=True))
+
+
+def _close(entry, totals):
+    event, children = entry
+    row = totals[(event["cat"], event["name"])]
+    row["count"] += 1
+    row["total_s"] += event["dur"] / 1_000_000
+    row["self_s"] += max(event["dur"] - children, 0) / 1_000_000
+
+
+def print_summary(summary, top=10):
+    print(f"{'category':<11} {'span':<60} {'count':>6} {'self':>9} {'total':>9}")
+    for (cat, name), row in list(summary.items())[:top]:
+        print(f"{cat:<11} {name[:60]:<60} {row['count']:>6} {row['self_s']:>8.1f}s {row['total_s']:>8.1f}s")
+
+
+# Summarize a saved trace file: python tracing.py trace.json [top]
+if __name__ == "__main__":
+    with open(sys.argv[1], "r") as file:
+        trace = json.load(file)
+    print_summary(summarize(trace["traceEvents"]), int(sys.argv[2]) if len(sys.argv) > 2 else 10)
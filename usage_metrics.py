@@ -0,0 +1,199 @@
+from crewai.utilities.events import (
+    AgentExecutionStartedEvent,
+    CrewKickoffStartedEvent,
+)
+from crewai.utilities.events.base_event_listener import BaseEventListener
+from litellm.integrations.custom_logger import CustomLogger
+from dataclasses import dataclass, asdict, field
+from collections import defaultdict
+import contextvars, json, threading, time
+import litellm
+
+# Price per 1M tokens in USD (input, output). Keys are matched against the model name without the provider prefix.
+# Gemini prices from https://ai.google.dev/pricing, edit or pass your own table to UsageTracker if they change.
+DEFAULT_PRICE_TABLE = {
+    "gemini-2.0-flash-lite": {"input": 0.075, "output": 0.30, "cached_input": 0.01875},
+    "gemini-2.0-flash": {"input": 0.10, "output": 0.40, "cached_input": 0.025},
+    "gpt-4o-mini": {"input": 0.150, "output": 0.600, "cached_input": 0.075},
+}
+
+# Tags of the LLM call currently running (crew, agent, task).
+# They are set by the crewAI event listener below and read when litellm reports a finished call.
+current_tags = contextvars.ContextVar("current_tags", default={})
+
+
+@dataclass
+class LLMCallRecord:
+    crew: str
+    agent: str
+    task: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    cached_tokens: int
+    latency_s: float
+    cache_hit: bool
+    cost_usd: float
+    timestamp: float = field(default_factory=time.time)
+
+
+def _bare_model_name(model):
+    # "gemini/gemini-2.0-flash" -> "gemini-2.0-flash"
+    return (model or "unknown").split("/")[-1]
+
+
+def _short(text, limit=60):
+    # Task descriptions can be very long, keep only the first line for tagging
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+class UsageTracker(CustomLogger, BaseEventListener):
+    """
+    Records prompt/completion tokens, latency and cache hits of every LLM call,
+    tagged by crew, agent, task and model.
+    Create it once before kickoff, then read .summary() or export the records.
+    """
+
+    def __init__(self, price_table=None, crew_name=None):
+        CustomLogger.__init__(self)
+        self.price_table = dict(price_table or DEFAULT_PRICE_TABLE)
+        self.crew_name = crew_name
+        self.records = []
+        self._lock = threading.Lock()
+        # crewAI overwrites litellm.callbacks on every call, success_callback keeps custom loggers of other types
+        if self not in litellm.success_callback:
+            litellm.success_callback.append(self)
+        BaseEventListener.__init__(self)
+
+    # crewAI events only give us the tags, token counts come from litellm below
+    def setup_listeners(self, crewai_event_bus):
+        @crewai_event_bus.on(CrewKickoffStartedEvent)
+        def on_crew_started(source, event):
+            current_tags.set({"crew": self.crew_name or event.crew_name or "crew"})
+
+        @crewai_event_bus.on(AgentExecutionStartedEvent)
+        def on_agent_started(source, event):
+            tags = dict(current_tags.get())
+            tags["agent"] = event.agent.role.strip()
+            tags["task"] = _short(event.task.name or event.task.description) if event.task else ""
+            current_tags.set(tags)
+
+    def price_for(self, model):
+        # Longest matching key wins, so "gemini-2.0-flash-lite" is not priced as "gemini-2.0-flash"
+        name = _bare_model_name(model)
+        matches = [key for key in self.price_table if name.startswith(key)]
+        if not matches:
+            return None
+        return self.price_table[max(matches, key=len)]
+
+    def cost_of(self, model, prompt_tokens, completion_tokens, cached_tokens=0):
+        price = self.price_for(model)
+        if price is None:
+            return 0.0
+        cached_price = price.get("cached_input", price["input"])
+        return (
+            (prompt_tokens - cached_tokens) * price["input"]
+            + cached_tokens * cached_price
+            + completion_tokens * price["output"]
+        ) / 1_000_000
+
+    # litellm calls this after each successful completion (sync and streaming)
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        usage = getattr(response_obj, "usage", None)
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+        model = _bare_model_name(kwargs.get("model"))
+        tags = current_tags.get()
+
+        record = LLMCallRecord(
+            crew=tags.get("crew", self.crew_name or "crew"),
+            # Calls made outside an agent execution are the manager agent of hierarchical crews or the output converter
+            agent=tags.get("agent", "(unattributed)"),
+            task=tags.get("task", ""),
+            model=model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cached_tokens=cached_tokens,
+            latency_s=(end_time - start_time).total_seconds(),
+            cache_hit=bool(kwargs.get("cache_hit")),
+            cost_usd=self.cost_of(model, prompt_tokens, completion_tokens, cached_tokens),
+        )
+        with self._lock:
+            self.records.append(record)
+
+    async def async_log_success_event(self, kwargs, response_obj, start_time, end_time):
+        self.log_success_event(kwargs, response_obj, start_time, end_time)
+
+    def summary(self, by=("agent", "model")):
+        # Aggregate the records, e.g. summary(by=("task",)) to see which task is the most expensive
+        totals = defaultdict(lambda: {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                                      "cached_tokens": 0, "cache_hits": 0, "latency_s": 0.0, "cost_usd": 0.0})
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            row = totals[tuple(getattr(record, key) for key in by)]
+            row["calls"] += 1
+            row["prompt_tokens"] += record.prompt_tokens
+            row["completion_tokens"] += record.completion_tokens
+            row["cached_tokens"] += record.cached_tokens
+            row["cache_hits"] += int(record.cache_hit)
+            row["latency_s"] += record.latency_s
+            row["cost_usd"] += record.cost_usd
+        # Most expensive first
+        return dict(sorted(totals.items(), key=lambda item: item[1]["cost_usd"], reverse=True))
+
+    def total_cost(self):
+        with self._lock:
+            return sum(record.cost_usd for record in self.records)
+
+    def print_summary(self, by=("agent", "model")):
+        print(f"{' / '.join(by):<60} {'calls':>6} {'tokens':>10} {'latency':>9} {'cost':>9}")
+        for key, row in self.summary(by).items():
+            tokens = row["prompt_tokens"] + row["completion_tokens"]
+            print(f"{' / '.join(key)[:60]:<60} {row['calls']:>6} {tokens:>10} {row['latency_s']:>8.1f}s ${row['cost_usd']:>8.4f}")
+        print(f"Total costs: ${self.total_cost():.4f}")
+
+    def export_jsonl(self, path):
+        # One JSON object per LLM call, appended so several runs can share a file
+        with self._lock:
+            records = list(self.records)
+        with open(path, "a") as file:
+            for record in records:
+                file.write(json.dumps(asdict(record)) + "\n")
+
+    def export_prometheus(self, path=None):
+        # Prometheus text exposition format, can be served by node_exporter's textfile collector
+        lines = []
+        metrics = [
+            ("crewai_llm_calls_total", "counter", "Number of LLM calls", "calls"),
+            ("crewai_llm_prompt_tokens_total", "counter", "Prompt tokens sent", "prompt_tokens"),
+            ("crewai_llm_completion_tokens_total", "counter", "Completion tokens received", "completion_tokens"),
+            ("crewai_llm_cached_tokens_total", "counter", "Prompt tokens served from the context cache", "cached_tokens"),
+            ("crewai_llm_cache_hits_total", "counter", "Calls answered from the litellm cache", "cache_hits"),
+            ("crewai_llm_latency_seconds_total", "counter", "Total LLM latency", "latency_s"),
+            ("crewai_llm_cost_usd_total", "counter", "Estimated cost in USD", "cost_usd"),
+        ]
+        summary = self.summary(by=("crew", "agent", "task", "model"))
+        for name, metric_type, help_text, key in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for (crew, agent, task, model), row in summary.items():
+                labels = ",".join(
+                    f'{label}="{_escape_label(value)}"'
+                    for label, value in (("crew", crew), ("agent", agent), ("task", task), ("model", model))
+                )
+                lines.append(f"{name}{{{labels}}} {row[key]}")
+        text = "\n".join(lines) + "\n"
+        if path:
+            with open(path, "w") as file:
+                file.write(text)
+        return text
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")